@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+
+class AliasSampler():
+    def __init__(self, ids: 'Iterable[int]', wts: 'Iterable[float]' = None):
+        """ Sampler of ids with replacement, in proportion to their weights, using Vose's alias
+        method. Building the alias table is O(# of ids), after which every draw is O(1): an id
+        slot is picked uniformly, then either kept or swapped for its alias.
+        Args:
+            ids (Iterable[int]): Ids to sample
+            wts (Iterable[float]): Non-negative weight of every id, default None for uniform
+        """
+        self.ids = np.asarray(ids)
+        n = self.ids.shape[0]
+        if n == 0:
+            raise ValueError('Cannot sample from an empty set of ids')
+        if wts is None:
+            wts = np.ones(n)
+        wts = np.asarray(wts, dtype=np.float64)
+        if (wts < 0).any() or not (wts.sum() > 0):
+            raise ValueError('Weights must be non-negative with a positive sum')
+        # Number of distinct ids that can be drawn
+        self.n_support = np.unique(self.ids[wts > 0]).shape[0]
+        # Probability of keeping each slot, scaled so that the average slot holds 1
+        self.prob = wts * n / wts.sum()
+        self.alias = np.arange(n)
+        small = np.flatnonzero(self.prob < 1).tolist()
+        large = np.flatnonzero(self.prob >= 1).tolist()
+        prob = self.prob.tolist()
+        alias = self.alias.tolist()
+        while small and large:
+            less, more = small.pop(), large.pop()
+            alias[less] = more
+            prob[more] -= 1 - prob[less]
+            if prob[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+        # Remaining slots are full up to floating point error
+        for idx in small + large:
+            prob[idx] = 1
+        self.prob = np.array(prob)
+        self.alias = np.array(alias)
+
+    @classmethod
+    def from_frame(cls, id2df: pd.DataFrame) -> 'AliasSampler':
+        """ Create a sampler of an entity2id or relation2id table, with ids in column 'id' and
+        weights in column 'wt'
+        """
+        return cls(id2df['id'].to_numpy(), id2df['wt'].to_numpy())
+
+    def __len__(self) -> int:
+        return self.ids.shape[0]
+
+    def draw(self, size=None, rng: np.random.Generator = None) -> np.ndarray:
+        """ Draw ids with replacement, as an array of shape size
+        """
+        rng = np.random.default_rng(rng)
+        slots = rng.integers(len(self), size=size)
+        keep = rng.random(size=size) < self.prob[slots]
+        return self.ids[np.where(keep, slots, self.alias[slots])]
@@ -1,4 +1,4 @@
-import scipy
+from distributions import Distribution
 
 
 configs = [
@@ -14,8 +14,9 @@ configs = [
         # Basic stats
         # Number of runs, each run will have a dedicated directory inside export_dir
         'n_runs': 10,
-        # Number of jobs
-        'n_jobs': 10,
+        # Random seed, from which an independent random number generator is derived for every
+        # run. Set to None for runs that cannot be reproduced
+        'seed': 0,
         # Number of entities
         'n_ents': 5_000,
         # Number of relations
@@ -25,45 +26,57 @@ configs = [
 
         # Patterns
         # Distribution over entities, determining which are used to populate pattern templates.
-        # Should be a function taking a number of entities as input and returning the same number
-        # of weights. Defaults to uniform distribution
-        'pat_distr_ents': None,  #lambda x: scipy.stats.gamma.rvs(1, loc=0, scale=2, size=x),
+        # Should be a Distribution, or a function taking a number of entities and a numpy random
+        # Generator as input and returning the same number of weights. Defaults to uniform
+        # distribution
+        'pat_distr_ents': None,  #Distribution('gamma', 1, loc=0, scale=2),
         # Distribution over relations, determining which are used to populate pattern templates
-        # Should be a function taking a number of relations as input and returning the same number
-        # of weights. Defaults to uniform distribution
-        'pat_distr_rels': None,  #lambda x: scipy.stats.gamma.rvs(1, loc=0, scale=2, size=x),
+        # Should be a Distribution, or a function taking a number of relations and a numpy random
+        # Generator as input and returning the same number of weights. Defaults to uniform
+        # distribution
+        'pat_distr_rels': None,  #Distribution('gamma', 1, loc=0, scale=2),
         # Number of 3-hop patterns
         'n_3_hop': 100,
-        # Time lag for 3-hop patterns
+        # Time lag for 3-hop patterns. Bounds are integers, Distributions, or functions taking a
+        # number of patterns and a numpy random Generator and returning that many integers
         'time_lag_3_hop': [
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (0, Distribution('poisson', 5)),
+            (0, Distribution('poisson', 5)),
+            (1, Distribution('poisson', 5)),
         ],
         # Number of 2-hop patterns
         'n_2_hop': 100,
         # Time lag for 2-hop patterns
         'time_lag_2_hop': [
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (0, Distribution('poisson', 5)),
+            (1, Distribution('poisson', 5)),
         ],
         # Number of 1-hop patterns
         'n_1_hop': 100,
         # Time lag for 1-hop patterns
         'time_lag_1_hop': [
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (1, Distribution('poisson', 5)),
         ],
         # Maximum number of times to search for a valid pattern to instantiate
         # before moving on
         'max_retries': 1,
+        # Instantiate patterns by filling the entity-role templates of all_patterns_*_hop.xlsx
+        # with distinct entities, instead of sampling entities freely and repairing them
+        'pattern_templates': True,
+        # Weights with which templates are sampled, None for uniform. Should be a function taking
+        # the role table of the templates of one number of hops, of shape (# of templates,
+        # 2*(# of hops+1)), and returning one weight per template
+        'template_wts': None,
 
         # Edge list creation
         # Density with which we randomly wire entities per window
         # Overridden by rnd_avg_density_distr if it is not None
         'rnd_avg_density': 1,
-        # Function that returns an integer to be used for average density per entity
+        # Distribution, or function taking a number of entities and a numpy random Generator and
+        # returning that many integers, to be used for average density per entity. All densities
+        # of a time window are drawn in one call
         # Setting to None will cause rnd_avg_density to be used instead
-        'rnd_avg_density_distr': None,  #lambda: scipy.stats.poisson.rvs(1, size=1)[0],
+        'rnd_avg_density_distr': None,  #Distribution('poisson', 1),
         # Probability that we do not apply a given pattern, per valid pattern (with all antecedents
         # satisfied in previous time windows)
         'p_skip_consequence': 0,
@@ -74,6 +87,12 @@ configs = [
             2: .1,
             3: .1,
         },
+
+        # Out-of-core generation
+        # Number of time windows per chunk of edges that is written to disk once its windows are
+        # complete, so that only about this many windows of edges are held in memory. Chunks are
+        # aggregated, labeled and exported one at a time. None keeps all edges in memory
+        'chunk_tws': None,
     },
     # Uniform distribution over entities, long-tail (gamma) distribution over relations
     {
@@ -87,8 +106,9 @@ configs = [
         # Basic stats
         # Number of runs, each run will have a dedicated directory inside export_dir
         'n_runs': 10,
-        # Number of jobs
-        'n_jobs': 10,
+        # Random seed, from which an independent random number generator is derived for every
+        # run. Set to None for runs that cannot be reproduced
+        'seed': 1,
         # Number of entities
         'n_ents': 5_000,
         # Number of relations
@@ -98,45 +118,57 @@ configs = [
 
         # Patterns
         # Distribution over entities, determining which are used to populate pattern templates.
-        # Should be a function taking a number of entities as input and returning the same number
-        # of weights. Defaults to uniform distribution
-        'pat_distr_ents': None,  #lambda x: scipy.stats.gamma.rvs(1, loc=0, scale=2, size=x),
+        # Should be a Distribution, or a function taking a number of entities and a numpy random
+        # Generator as input and returning the same number of weights. Defaults to uniform
+        # distribution
+        'pat_distr_ents': None,  #Distribution('gamma', 1, loc=0, scale=2),
         # Distribution over relations, determining which are used to populate pattern templates
-        # Should be a function taking a number of relations as input and returning the same number
-        # of weights. Defaults to uniform distribution
-        'pat_distr_rels': lambda x: scipy.stats.gamma.rvs(1, loc=0, scale=2, size=x),
+        # Should be a Distribution, or a function taking a number of relations and a numpy random
+        # Generator as input and returning the same number of weights. Defaults to uniform
+        # distribution
+        'pat_distr_rels': Distribution('gamma', 1, loc=0, scale=2),
         # Number of 3-hop patterns
         'n_3_hop': 100,
-        # Time lag for 3-hop patterns
+        # Time lag for 3-hop patterns. Bounds are integers, Distributions, or functions taking a
+        # number of patterns and a numpy random Generator and returning that many integers
         'time_lag_3_hop': [
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (0, Distribution('poisson', 5)),
+            (0, Distribution('poisson', 5)),
+            (1, Distribution('poisson', 5)),
         ],
         # Number of 2-hop patterns
         'n_2_hop': 100,
         # Time lag for 2-hop patterns
         'time_lag_2_hop': [
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (0, Distribution('poisson', 5)),
+            (1, Distribution('poisson', 5)),
         ],
         # Number of 1-hop patterns
         'n_1_hop': 100,
         # Time lag for 1-hop patterns
         'time_lag_1_hop': [
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (1, Distribution('poisson', 5)),
         ],
         # Maximum number of times to search for a valid pattern to instantiate
         # before moving on
         'max_retries': 1,
+        # Instantiate patterns by filling the entity-role templates of all_patterns_*_hop.xlsx
+        # with distinct entities, instead of sampling entities freely and repairing them
+        'pattern_templates': True,
+        # Weights with which templates are sampled, None for uniform. Should be a function taking
+        # the role table of the templates of one number of hops, of shape (# of templates,
+        # 2*(# of hops+1)), and returning one weight per template
+        'template_wts': None,
 
         # Edge list creation
         # Density with which we randomly wire entities per window
         # Overridden by rnd_avg_density_distr if it is not None
         'rnd_avg_density': 1,
-        # Function that returns an integer to be used for average density per entity
+        # Distribution, or function taking a number of entities and a numpy random Generator and
+        # returning that many integers, to be used for average density per entity. All densities
+        # of a time window are drawn in one call
         # Setting to None will cause rnd_avg_density to be used instead
-        'rnd_avg_density_distr': None,  #lambda: scipy.stats.poisson.rvs(1, size=1)[0],
+        'rnd_avg_density_distr': None,  #Distribution('poisson', 1),
         # Probability that we do not apply a given pattern, per valid pattern (with all antecedents
         # satisfied in previous time windows)
         'p_skip_consequence': 0,
@@ -147,6 +179,12 @@ configs = [
             2: .1,
             3: .1,
         },
+
+        # Out-of-core generation
+        # Number of time windows per chunk of edges that is written to disk once its windows are
+        # complete, so that only about this many windows of edges are held in memory. Chunks are
+        # aggregated, labeled and exported one at a time. None keeps all edges in memory
+        'chunk_tws': None,
     },
     # # Long-tail (gamma) distribution over entities, uniform distribution over relations
     # {
@@ -160,8 +198,9 @@ configs = [
     #     # Basic stats
     #     # Number of runs, each run will have a dedicated directory inside export_dir
     #     'n_runs': 10,
-    #     # Number of jobs
-    #     'n_jobs': 10,
+    #     # Random seed, from which an independent random number generator is derived for every
+    #     # run. Set to None for runs that cannot be reproduced
+    #     'seed': 2,
     #     # Number of entities
     #     'n_ents': 5_000,
     #     # Number of relations
@@ -171,45 +210,57 @@ configs = [
 
     #     # Patterns
     #     # Distribution over entities, determining which are used to populate pattern templates.
-    #     # Should be a function taking a number of entities as input and returning the same number
-    #     # of weights. Defaults to uniform distribution
-    #     'pat_distr_ents': lambda x: scipy.stats.gamma.rvs(.1, loc=0, scale=10, size=x),
+    #     # Should be a Distribution, or a function taking a number of entities and a numpy random
+    #     # Generator as input and returning the same number of weights. Defaults to uniform
+    #     # distribution
+    #     'pat_distr_ents': Distribution('gamma', .1, loc=0, scale=10),
     #     # Distribution over relations, determining which are used to populate pattern templates
-    #     # Should be a function taking a number of relations as input and returning the same number
-    #     # of weights. Defaults to uniform distribution
-    #     'pat_distr_rels': None,  #lambda x: scipy.stats.gamma.rvs(1, loc=0, scale=2, size=x),
+    #     # Should be a Distribution, or a function taking a number of relations and a numpy random
+    #     # Generator as input and returning the same number of weights. Defaults to uniform
+    #     # distribution
+    #     'pat_distr_rels': None,  #Distribution('gamma', 1, loc=0, scale=2),
     #     # Number of 3-hop patterns
     #     'n_3_hop': 100,
-    #     # Time lag for 3-hop patterns
+    #     # Time lag for 3-hop patterns. Bounds are integers, Distributions, or functions taking a
+    #     # number of patterns and a numpy random Generator and returning that many integers
     #     'time_lag_3_hop': [
-    #         (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-    #         (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-    #         (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+    #         (0, Distribution('poisson', 5)),
+    #         (0, Distribution('poisson', 5)),
+    #         (1, Distribution('poisson', 5)),
     #     ],
     #     # Number of 2-hop patterns
     #     'n_2_hop': 100,
     #     # Time lag for 2-hop patterns
     #     'time_lag_2_hop': [
-    #         (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-    #         (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+    #         (0, Distribution('poisson', 5)),
+    #         (1, Distribution('poisson', 5)),
     #     ],
     #     # Number of 1-hop patterns
     #     'n_1_hop': 100,
     #     # Time lag for 1-hop patterns
     #     'time_lag_1_hop': [
-    #         (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+    #         (1, Distribution('poisson', 5)),
     #     ],
     #     # Maximum number of times to search for a valid pattern to instantiate
     #     # before moving on
     #     'max_retries': 1,
+    #     # Instantiate patterns by filling the entity-role templates of all_patterns_*_hop.xlsx
+    #     # with distinct entities, instead of sampling entities freely and repairing them
+    #     'pattern_templates': True,
+    #     # Weights with which templates are sampled, None for uniform. Should be a function taking
+    #     # the role table of the templates of one number of hops, of shape (# of templates,
+    #     # 2*(# of hops+1)), and returning one weight per template
+    #     'template_wts': None,
 
     #     # Edge list creation
     #     # Density with which we randomly wire entities per window
     #     # Overridden by rnd_avg_density_distr if it is not None
     #     'rnd_avg_density': 1,
-    #     # Function that returns an integer to be used for average density per entity
+    #     # Distribution, or function taking a number of entities and a numpy random Generator and
+    #     # returning that many integers, to be used for average density per entity. All densities
+    #     # of a time window are drawn in one call
     #     # Setting to None will cause rnd_avg_density to be used instead
-    #     'rnd_avg_density_distr': None,  #lambda: scipy.stats.poisson.rvs(1, size=1)[0],
+    #     'rnd_avg_density_distr': None,  #Distribution('poisson', 1),
     #     # Probability that we do not apply a given pattern, per valid pattern (with all antecedents
     #     # satisfied in previous time windows)
     #     'p_skip_consequence': 0,
@@ -220,6 +271,12 @@ configs = [
     #         2: .1,
     #         3: .1,
     #     },
+
+    #     # Out-of-core generation
+    #     # Number of time windows per chunk of edges that is written to disk once its windows are
+    #     # complete, so that only about this many windows of edges are held in memory. Chunks are
+    #     # aggregated, labeled and exported one at a time. None keeps all edges in memory
+    #     'chunk_tws': None,
     # },
     # # Long-tail (gamma) distribution over entities, long-tail (gamma) distribution over relations
     # {
@@ -233,8 +290,9 @@ configs = [
     #     # Basic stats
     #     # Number of runs, each run will have a dedicated directory inside export_dir
     #     'n_runs': 10,
-    #     # Number of jobs
-    #     'n_jobs': 10,
+    #     # Random seed, from which an independent random number generator is derived for every
+    #     # run. Set to None for runs that cannot be reproduced
+    #     'seed': 3,
     #     # Number of entities
     #     'n_ents': 5_000,
     #     # Number of relations
@@ -244,45 +302,57 @@ configs = [
 
     #     # Patterns
     #     # Distribution over entities, determining which are used to populate pattern templates.
-    #     # Should be a function taking a number of entities as input and returning the same number
-    #     # of weights. Defaults to uniform distribution
-    #     'pat_distr_ents': lambda x: scipy.stats.gamma.rvs(.1, loc=0, scale=10, size=x),
+    #     # Should be a Distribution, or a function taking a number of entities and a numpy random
+    #     # Generator as input and returning the same number of weights. Defaults to uniform
+    #     # distribution
+    #     'pat_distr_ents': Distribution('gamma', .1, loc=0, scale=10),
     #     # Distribution over relations, determining which are used to populate pattern templates
-    #     # Should be a function taking a number of relations as input and returning the same number
-    #     # of weights. Defaults to uniform distribution
-    #     'pat_distr_rels': lambda x: scipy.stats.gamma.rvs(1, loc=0, scale=2, size=x),
+    #     # Should be a Distribution, or a function taking a number of relations and a numpy random
+    #     # Generator as input and returning the same number of weights. Defaults to uniform
+    #     # distribution
+    #     'pat_distr_rels': Distribution('gamma', 1, loc=0, scale=2),
     #     # Number of 3-hop patterns
     #     'n_3_hop': 100,
-    #     # Time lag for 3-hop patterns
+    #     # Time lag for 3-hop patterns. Bounds are integers, Distributions, or functions taking a
+    #     # number of patterns and a numpy random Generator and returning that many integers
     #     'time_lag_3_hop': [
-    #         (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-    #         (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-    #         (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+    #         (0, Distribution('poisson', 5)),
+    #         (0, Distribution('poisson', 5)),
+    #         (1, Distribution('poisson', 5)),
     #     ],
     #     # Number of 2-hop patterns
     #     'n_2_hop': 100,
     #     # Time lag for 2-hop patterns
     #     'time_lag_2_hop': [
-    #         (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-    #         (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+    #         (0, Distribution('poisson', 5)),
+    #         (1, Distribution('poisson', 5)),
     #     ],
     #     # Number of 1-hop patterns
     #     'n_1_hop': 100,
     #     # Time lag for 1-hop patterns
     #     'time_lag_1_hop': [
-    #         (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+    #         (1, Distribution('poisson', 5)),
     #     ],
     #     # Maximum number of times to search for a valid pattern to instantiate
     #     # before moving on
     #     'max_retries': 1,
+    #     # Instantiate patterns by filling the entity-role templates of all_patterns_*_hop.xlsx
+    #     # with distinct entities, instead of sampling entities freely and repairing them
+    #     'pattern_templates': True,
+    #     # Weights with which templates are sampled, None for uniform. Should be a function taking
+    #     # the role table of the templates of one number of hops, of shape (# of templates,
+    #     # 2*(# of hops+1)), and returning one weight per template
+    #     'template_wts': None,
 
     #     # Edge list creation
     #     # Density with which we randomly wire entities per window
     #     # Overridden by rnd_avg_density_distr if it is not None
     #     'rnd_avg_density': 1,
-    #     # Function that returns an integer to be used for average density per entity
+    #     # Distribution, or function taking a number of entities and a numpy random Generator and
+    #     # returning that many integers, to be used for average density per entity. All densities
+    #     # of a time window are drawn in one call
     #     # Setting to None will cause rnd_avg_density to be used instead
-    #     'rnd_avg_density_distr': None,  #lambda: scipy.stats.poisson.rvs(1, size=1)[0],
+    #     'rnd_avg_density_distr': None,  #Distribution('poisson', 1),
     #     # Probability that we do not apply a given pattern, per valid pattern (with all antecedents
     #     # satisfied in previous time windows)
     #     'p_skip_consequence': 0,
@@ -293,6 +363,12 @@ configs = [
     #         2: .1,
     #         3: .1,
     #     },
+
+    #     # Out-of-core generation
+    #     # Number of time windows per chunk of edges that is written to disk once its windows are
+    #     # complete, so that only about this many windows of edges are held in memory. Chunks are
+    #     # aggregated, labeled and exported one at a time. None keeps all edges in memory
+    #     'chunk_tws': None,
     # },
     # More 1-hop than 3-hop patterns (4x)
     {
@@ -306,8 +382,9 @@ configs = [
         # Basic stats
         # Number of runs, each run will have a dedicated directory inside export_dir
         'n_runs': 10,
-        # Number of jobs
-        'n_jobs': 10,
+        # Random seed, from which an independent random number generator is derived for every
+        # run. Set to None for runs that cannot be reproduced
+        'seed': 4,
         # Number of entities
         'n_ents': 5_000,
         # Number of relations
@@ -317,45 +394,57 @@ configs = [
 
         # Patterns
         # Distribution over entities, determining which are used to populate pattern templates.
-        # Should be a function taking a number of entities as input and returning the same number
-        # of weights. Defaults to uniform distribution
-        'pat_distr_ents': None,  #lambda x: scipy.stats.gamma.rvs(1, loc=0, scale=2, size=x),
+        # Should be a Distribution, or a function taking a number of entities and a numpy random
+        # Generator as input and returning the same number of weights. Defaults to uniform
+        # distribution
+        'pat_distr_ents': None,  #Distribution('gamma', 1, loc=0, scale=2),
         # Distribution over relations, determining which are used to populate pattern templates
-        # Should be a function taking a number of relations as input and returning the same number
-        # of weights. Defaults to uniform distribution
-        'pat_distr_rels': None,  #lambda x: scipy.stats.gamma.rvs(1, loc=0, scale=2, size=x),
+        # Should be a Distribution, or a function taking a number of relations and a numpy random
+        # Generator as input and returning the same number of weights. Defaults to uniform
+        # distribution
+        'pat_distr_rels': None,  #Distribution('gamma', 1, loc=0, scale=2),
         # Number of 3-hop patterns
         'n_3_hop': 25,
-        # Time lag for 3-hop patterns
+        # Time lag for 3-hop patterns. Bounds are integers, Distributions, or functions taking a
+        # number of patterns and a numpy random Generator and returning that many integers
         'time_lag_3_hop': [
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (0, Distribution('poisson', 5)),
+            (0, Distribution('poisson', 5)),
+            (1, Distribution('poisson', 5)),
         ],
         # Number of 2-hop patterns
         'n_2_hop': 100,
         # Time lag for 2-hop patterns
         'time_lag_2_hop': [
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (0, Distribution('poisson', 5)),
+            (1, Distribution('poisson', 5)),
         ],
         # Number of 1-hop patterns
         'n_1_hop': 400,
         # Time lag for 1-hop patterns
         'time_lag_1_hop': [
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (1, Distribution('poisson', 5)),
         ],
         # Maximum number of times to search for a valid pattern to instantiate
         # before moving on
         'max_retries': 1,
+        # Instantiate patterns by filling the entity-role templates of all_patterns_*_hop.xlsx
+        # with distinct entities, instead of sampling entities freely and repairing them
+        'pattern_templates': True,
+        # Weights with which templates are sampled, None for uniform. Should be a function taking
+        # the role table of the templates of one number of hops, of shape (# of templates,
+        # 2*(# of hops+1)), and returning one weight per template
+        'template_wts': None,
 
         # Edge list creation
         # Density with which we randomly wire entities per window
         # Overridden by rnd_avg_density_distr if it is not None
         'rnd_avg_density': 1,
-        # Function that returns an integer to be used for average density per entity
+        # Distribution, or function taking a number of entities and a numpy random Generator and
+        # returning that many integers, to be used for average density per entity. All densities
+        # of a time window are drawn in one call
         # Setting to None will cause rnd_avg_density to be used instead
-        'rnd_avg_density_distr': None,  #lambda: scipy.stats.poisson.rvs(1, size=1)[0],
+        'rnd_avg_density_distr': None,  #Distribution('poisson', 1),
         # Probability that we do not apply a given pattern, per valid pattern (with all antecedents
         # satisfied in previous time windows)
         'p_skip_consequence': 0,
@@ -366,6 +455,12 @@ configs = [
             2: .1,
             3: .025,
         },
+
+        # Out-of-core generation
+        # Number of time windows per chunk of edges that is written to disk once its windows are
+        # complete, so that only about this many windows of edges are held in memory. Chunks are
+        # aggregated, labeled and exported one at a time. None keeps all edges in memory
+        'chunk_tws': None,
     },
     # More 1-hop than 3-hop patterns (2x)
     {
@@ -379,8 +474,9 @@ configs = [
         # Basic stats
         # Number of runs, each run will have a dedicated directory inside export_dir
         'n_runs': 10,
-        # Number of jobs
-        'n_jobs': 10,
+        # Random seed, from which an independent random number generator is derived for every
+        # run. Set to None for runs that cannot be reproduced
+        'seed': 5,
         # Number of entities
         'n_ents': 5_000,
         # Number of relations
@@ -390,45 +486,57 @@ configs = [
 
         # Patterns
         # Distribution over entities, determining which are used to populate pattern templates.
-        # Should be a function taking a number of entities as input and returning the same number
-        # of weights. Defaults to uniform distribution
-        'pat_distr_ents': None,  #lambda x: scipy.stats.gamma.rvs(1, loc=0, scale=2, size=x),
+        # Should be a Distribution, or a function taking a number of entities and a numpy random
+        # Generator as input and returning the same number of weights. Defaults to uniform
+        # distribution
+        'pat_distr_ents': None,  #Distribution('gamma', 1, loc=0, scale=2),
         # Distribution over relations, determining which are used to populate pattern templates
-        # Should be a function taking a number of relations as input and returning the same number
-        # of weights. Defaults to uniform distribution
-        'pat_distr_rels': None,  #lambda x: scipy.stats.gamma.rvs(1, loc=0, scale=2, size=x),
+        # Should be a Distribution, or a function taking a number of relations and a numpy random
+        # Generator as input and returning the same number of weights. Defaults to uniform
+        # distribution
+        'pat_distr_rels': None,  #Distribution('gamma', 1, loc=0, scale=2),
         # Number of 3-hop patterns
         'n_3_hop': 50,
-        # Time lag for 3-hop patterns
+        # Time lag for 3-hop patterns. Bounds are integers, Distributions, or functions taking a
+        # number of patterns and a numpy random Generator and returning that many integers
         'time_lag_3_hop': [
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (0, Distribution('poisson', 5)),
+            (0, Distribution('poisson', 5)),
+            (1, Distribution('poisson', 5)),
         ],
         # Number of 2-hop patterns
         'n_2_hop': 100,
         # Time lag for 2-hop patterns
         'time_lag_2_hop': [
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (0, Distribution('poisson', 5)),
+            (1, Distribution('poisson', 5)),
         ],
         # Number of 1-hop patterns
         'n_1_hop': 200,
         # Time lag for 1-hop patterns
         'time_lag_1_hop': [
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (1, Distribution('poisson', 5)),
         ],
         # Maximum number of times to search for a valid pattern to instantiate
         # before moving on
         'max_retries': 1,
+        # Instantiate patterns by filling the entity-role templates of all_patterns_*_hop.xlsx
+        # with distinct entities, instead of sampling entities freely and repairing them
+        'pattern_templates': True,
+        # Weights with which templates are sampled, None for uniform. Should be a function taking
+        # the role table of the templates of one number of hops, of shape (# of templates,
+        # 2*(# of hops+1)), and returning one weight per template
+        'template_wts': None,
 
         # Edge list creation
         # Density with which we randomly wire entities per window
         # Overridden by rnd_avg_density_distr if it is not None
         'rnd_avg_density': 1,
-        # Function that returns an integer to be used for average density per entity
+        # Distribution, or function taking a number of entities and a numpy random Generator and
+        # returning that many integers, to be used for average density per entity. All densities
+        # of a time window are drawn in one call
         # Setting to None will cause rnd_avg_density to be used instead
-        'rnd_avg_density_distr': None,  #lambda: scipy.stats.poisson.rvs(1, size=1)[0],
+        'rnd_avg_density_distr': None,  #Distribution('poisson', 1),
         # Probability that we do not apply a given pattern, per valid pattern (with all antecedents
         # satisfied in previous time windows)
         'p_skip_consequence': 0,
@@ -439,6 +547,12 @@ configs = [
             2: .1,
             3: .05,
         },
+
+        # Out-of-core generation
+        # Number of time windows per chunk of edges that is written to disk once its windows are
+        # complete, so that only about this many windows of edges are held in memory. Chunks are
+        # aggregated, labeled and exported one at a time. None keeps all edges in memory
+        'chunk_tws': None,
     },
     # More 3-hop than 1-hop patterns (2x)
     {
@@ -452,8 +566,9 @@ configs = [
         # Basic stats
         # Number of runs, each run will have a dedicated directory inside export_dir
         'n_runs': 10,
-        # Number of jobs
-        'n_jobs': 10,
+        # Random seed, from which an independent random number generator is derived for every
+        # run. Set to None for runs that cannot be reproduced
+        'seed': 6,
         # Number of entities
         'n_ents': 5_000,
         # Number of relations
@@ -463,45 +578,57 @@ configs = [
 
         # Patterns
         # Distribution over entities, determining which are used to populate pattern templates.
-        # Should be a function taking a number of entities as input and returning the same number
-        # of weights. Defaults to uniform distribution
-        'pat_distr_ents': None,  #lambda x: scipy.stats.gamma.rvs(1, loc=0, scale=2, size=x),
+        # Should be a Distribution, or a function taking a number of entities and a numpy random
+        # Generator as input and returning the same number of weights. Defaults to uniform
+        # distribution
+        'pat_distr_ents': None,  #Distribution('gamma', 1, loc=0, scale=2),
         # Distribution over relations, determining which are used to populate pattern templates
-        # Should be a function taking a number of relations as input and returning the same number
-        # of weights. Defaults to uniform distribution
-        'pat_distr_rels': None,  #lambda x: scipy.stats.gamma.rvs(1, loc=0, scale=2, size=x),
+        # Should be a Distribution, or a function taking a number of relations and a numpy random
+        # Generator as input and returning the same number of weights. Defaults to uniform
+        # distribution
+        'pat_distr_rels': None,  #Distribution('gamma', 1, loc=0, scale=2),
         # Number of 3-hop patterns
         'n_3_hop': 200,
-        # Time lag for 3-hop patterns
+        # Time lag for 3-hop patterns. Bounds are integers, Distributions, or functions taking a
+        # number of patterns and a numpy random Generator and returning that many integers
         'time_lag_3_hop': [
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (0, Distribution('poisson', 5)),
+            (0, Distribution('poisson', 5)),
+            (1, Distribution('poisson', 5)),
         ],
         # Number of 2-hop patterns
         'n_2_hop': 100,
         # Time lag for 2-hop patterns
         'time_lag_2_hop': [
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (0, Distribution('poisson', 5)),
+            (1, Distribution('poisson', 5)),
         ],
         # Number of 1-hop patterns
         'n_1_hop': 50,
         # Time lag for 1-hop patterns
         'time_lag_1_hop': [
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (1, Distribution('poisson', 5)),
         ],
         # Maximum number of times to search for a valid pattern to instantiate
         # before moving on
         'max_retries': 1,
+        # Instantiate patterns by filling the entity-role templates of all_patterns_*_hop.xlsx
+        # with distinct entities, instead of sampling entities freely and repairing them
+        'pattern_templates': True,
+        # Weights with which templates are sampled, None for uniform. Should be a function taking
+        # the role table of the templates of one number of hops, of shape (# of templates,
+        # 2*(# of hops+1)), and returning one weight per template
+        'template_wts': None,
 
         # Edge list creation
         # Density with which we randomly wire entities per window
         # Overridden by rnd_avg_density_distr if it is not None
         'rnd_avg_density': 1,
-        # Function that returns an integer to be used for average density per entity
+        # Distribution, or function taking a number of entities and a numpy random Generator and
+        # returning that many integers, to be used for average density per entity. All densities
+        # of a time window are drawn in one call
         # Setting to None will cause rnd_avg_density to be used instead
-        'rnd_avg_density_distr': None,  #lambda: scipy.stats.poisson.rvs(1, size=1)[0],
+        'rnd_avg_density_distr': None,  #Distribution('poisson', 1),
         # Probability that we do not apply a given pattern, per valid pattern (with all antecedents
         # satisfied in previous time windows)
         'p_skip_consequence': 0,
@@ -512,6 +639,12 @@ configs = [
             2: .1,
             3: .2,
         },
+
+        # Out-of-core generation
+        # Number of time windows per chunk of edges that is written to disk once its windows are
+        # complete, so that only about this many windows of edges are held in memory. Chunks are
+        # aggregated, labeled and exported one at a time. None keeps all edges in memory
+        'chunk_tws': None,
     },
     # More 3-hop than 1-hop patterns (4x)
     {
@@ -525,8 +658,9 @@ configs = [
         # Basic stats
         # Number of runs, each run will have a dedicated directory inside export_dir
         'n_runs': 10,
-        # Number of jobs
-        'n_jobs': 10,
+        # Random seed, from which an independent random number generator is derived for every
+        # run. Set to None for runs that cannot be reproduced
+        'seed': 7,
         # Number of entities
         'n_ents': 5_000,
         # Number of relations
@@ -536,45 +670,57 @@ configs = [
 
         # Patterns
         # Distribution over entities, determining which are used to populate pattern templates.
-        # Should be a function taking a number of entities as input and returning the same number
-        # of weights. Defaults to uniform distribution
-        'pat_distr_ents': None,  #lambda x: scipy.stats.gamma.rvs(1, loc=0, scale=2, size=x),
+        # Should be a Distribution, or a function taking a number of entities and a numpy random
+        # Generator as input and returning the same number of weights. Defaults to uniform
+        # distribution
+        'pat_distr_ents': None,  #Distribution('gamma', 1, loc=0, scale=2),
         # Distribution over relations, determining which are used to populate pattern templates
-        # Should be a function taking a number of relations as input and returning the same number
-        # of weights. Defaults to uniform distribution
-        'pat_distr_rels': None,  #lambda x: scipy.stats.gamma.rvs(1, loc=0, scale=2, size=x),
+        # Should be a Distribution, or a function taking a number of relations and a numpy random
+        # Generator as input and returning the same number of weights. Defaults to uniform
+        # distribution
+        'pat_distr_rels': None,  #Distribution('gamma', 1, loc=0, scale=2),
         # Number of 3-hop patterns
         'n_3_hop': 400,
-        # Time lag for 3-hop patterns
+        # Time lag for 3-hop patterns. Bounds are integers, Distributions, or functions taking a
+        # number of patterns and a numpy random Generator and returning that many integers
         'time_lag_3_hop': [
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (0, Distribution('poisson', 5)),
+            (0, Distribution('poisson', 5)),
+            (1, Distribution('poisson', 5)),
         ],
         # Number of 2-hop patterns
         'n_2_hop': 100,
         # Time lag for 2-hop patterns
         'time_lag_2_hop': [
-            (0, lambda: scipy.stats.poisson(5).rvs(1)[0]),
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (0, Distribution('poisson', 5)),
+            (1, Distribution('poisson', 5)),
         ],
         # Number of 1-hop patterns
         'n_1_hop': 25,
         # Time lag for 1-hop patterns
         'time_lag_1_hop': [
-            (1, lambda: scipy.stats.poisson(5).rvs(1)[0]),
+            (1, Distribution('poisson', 5)),
         ],
         # Maximum number of times to search for a valid pattern to instantiate
         # before moving on
         'max_retries': 1,
+        # Instantiate patterns by filling the entity-role templates of all_patterns_*_hop.xlsx
+        # with distinct entities, instead of sampling entities freely and repairing them
+        'pattern_templates': True,
+        # Weights with which templates are sampled, None for uniform. Should be a function taking
+        # the role table of the templates of one number of hops, of shape (# of templates,
+        # 2*(# of hops+1)), and returning one weight per template
+        'template_wts': None,
 
         # Edge list creation
         # Density with which we randomly wire entities per window
         # Overridden by rnd_avg_density_distr if it is not None
         'rnd_avg_density': 1,
-        # Function that returns an integer to be used for average density per entity
+        # Distribution, or function taking a number of entities and a numpy random Generator and
+        # returning that many integers, to be used for average density per entity. All densities
+        # of a time window are drawn in one call
         # Setting to None will cause rnd_avg_density to be used instead
-        'rnd_avg_density_distr': None,  #lambda: scipy.stats.poisson.rvs(1, size=1)[0],
+        'rnd_avg_density_distr': None,  #Distribution('poisson', 1),
         # Probability that we do not apply a given pattern, per valid pattern (with all antecedents
         # satisfied in previous time windows)
         'p_skip_consequence': 0,
@@ -585,5 +731,11 @@ configs = [
             2: .1,
             3: .4,
         },
+
+        # Out-of-core generation
+        # Number of time windows per chunk of edges that is written to disk once its windows are
+        # complete, so that only about this many windows of edges are held in memory. Chunks are
+        # aggregated, labeled and exported one at a time. None keeps all edges in memory
+        'chunk_tws': None,
     },
 ]
\ No newline at end of file
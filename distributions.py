@@ -0,0 +1,39 @@
+import numpy as np
+import scipy.stats
+
+
+class Distribution():
+    def __init__(self, name: str, *args, **kwds):
+        """ Declarative specification of a scipy.stats distribution, used in config.py in
+        place of functions. Specs only hold the name and parameters of a distribution, so
+        configs holding them can be pickled and compared, and all values needed at once
+        are drawn in a single call, e.g. Distribution('poisson', 5)(size=n, rng=rng).
+        Args:
+            name (str): Name of the distribution in scipy.stats, e.g. 'poisson' or 'gamma'
+            args: Shape parameters of the distribution
+            kwds: Keyword parameters of the distribution, e.g. loc and scale
+        """
+        if not hasattr(getattr(scipy.stats, name, None), 'rvs'):
+            raise ValueError(f'Unknown distribution: {name}')
+        self.name = name
+        self.args = args
+        self.kwds = kwds
+
+    def __repr__(self) -> str:
+        params = [repr(arg) for arg in self.args] + \
+            [f'{key}={val!r}' for key, val in sorted(self.kwds.items())]
+        return f'Distribution({", ".join([repr(self.name)] + params)})'
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Distribution):
+            return NotImplemented
+        return repr(self) == repr(other)
+
+    def __hash__(self) -> int:
+        return hash(repr(self))
+
+    def __call__(self, size=None, rng: np.random.Generator = None):
+        """ Draw size values, or a single value if size is None
+        """
+        return getattr(scipy.stats, self.name).rvs(
+            *self.args, size=size, random_state=np.random.default_rng(rng), **self.kwds)
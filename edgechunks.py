@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+import os
+import shutil
+
+from patternmembership import PatternMembership
+
+
+class EdgeChunks():
+    # Columns of every chunk and the dtype each of them is kept in
+    dtypes = {
+        'head': np.int64,
+        'rel': np.int64,
+        'tail': np.int64,
+        't': np.int64,
+        'wt': np.float64,
+    }
+
+    def __init__(self, spill_dir: str = None):
+        """ Sequence of chunks of an edgelist, each covering consecutive time windows, along with
+        the pattern membership of their edges. Edges are numbered consecutively across chunks.
+        Chunks are either kept in memory or, if spill_dir is given, written to it as .npz files
+        and only loaded again one at a time, so memory use does not grow with the number of
+        time windows.
+        Args:
+            spill_dir (str): Directory to write chunks to, default None to keep them in memory
+        """
+        self.spill_dir = spill_dir
+        self.chunks = []
+        # Index of the first edge of every chunk, followed by the total number of edges
+        self.offsets = [0]
+        # Unique time windows of every chunk
+        self.unique_ts = []
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def n_edges(self) -> int:
+        return self.offsets[-1]
+
+    def append(self, edgelist: pd.DataFrame, membership: PatternMembership):
+        """ Add the next chunk
+        """
+        if self.spill_dir is None:
+            self.chunks.append((edgelist, membership))
+        else:
+            path = os.path.join(self.spill_dir, f'chunk_{len(self.chunks)}.npz')
+            np.savez(
+                path,
+                offsets=membership.offsets,
+                ids=membership.ids,
+                **{
+                    col: edgelist[col].to_numpy(dtype=dtype)
+                    for col, dtype in self.dtypes.items()
+                },
+            )
+            self.chunks.append(path)
+        self.offsets.append(self.offsets[-1] + edgelist.shape[0])
+        self.unique_ts.append(np.unique(edgelist['t'].to_numpy()))
+
+    def timestamps(self) -> np.ndarray:
+        """ Return the sorted time windows that hold at least one edge, over all chunks
+        """
+        return np.concatenate([np.empty(0, dtype=np.int64)] + self.unique_ts)
+
+    def __getitem__(self, idx: int) -> 'Tuple[pd.DataFrame,PatternMembership]':
+        """ Return edgelist and pattern membership of chunk idx
+        """
+        if self.spill_dir is None:
+            return self.chunks[idx]
+        with np.load(self.chunks[idx]) as chunk:
+            return (
+                pd.DataFrame({col: chunk[col] for col in self.dtypes}),
+                PatternMembership(chunk['offsets'], chunk['ids']),
+            )
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def clear(self):
+        """ Remove all chunks, including the spill directory
+        """
+        self.chunks = []
+        self.offsets = [0]
+        self.unique_ts = []
+        if self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+from patternmembership import PatternMembership
+
+
+def grow(columns: 'Dict[str,np.ndarray]', n_filled: int, capacity: int):
+    """ Reallocate all columns to capacity, keeping their first n_filled values. Note, replaces
+    the arrays of columns in place.
+    """
+    for col, values in columns.items():
+        grown = np.empty(capacity, dtype=values.dtype)
+        grown[:n_filled] = values[:n_filled]
+        columns[col] = grown
+
+
+class EdgeStore():
+    # Columns of the store and the dtype each of them is kept in
+    dtypes = {
+        'head': np.int64,
+        'rel': np.int64,
+        'tail': np.int64,
+        't': np.int64,
+        'wt': np.float64,
+    }
+
+    def __init__(self, capacity: int = 1024):
+        """ Append-only columnar store of the edges of a TKG. Every column is kept in a
+        preallocated NumPy array which doubles in size when full, so appending is amortized
+        O(1) per edge and DataFrames are only materialized when edges are popped. Pattern
+        membership is kept as (edge, pattern id) pairs in the same way.
+        Args:
+            capacity (int): Number of edges to preallocate space for
+        """
+        self.n_edges = 0
+        self.capacity = max(1, capacity)
+        self.columns = {
+            col: np.empty(self.capacity, dtype=dtype) for col, dtype in self.dtypes.items()
+        }
+        self.n_pairs = 0
+        self.pair_capacity = self.capacity
+        self.pairs = {
+            'edge': np.empty(self.pair_capacity, dtype=np.int64),
+            'pattern': np.empty(self.pair_capacity, dtype=np.int32),
+        }
+
+    def __len__(self) -> int:
+        return self.n_edges
+
+    def __getitem__(self, col: str) -> np.ndarray:
+        """ Return a view on the filled part of column col
+        """
+        return self.columns[col][:self.n_edges]
+
+    def append(
+        self,
+        head: 'Iterable[int]',
+        rel: 'Iterable[int]',
+        tail: 'Iterable[int]',
+        t: 'Iterable[int]',
+        wt: 'Iterable[float]' = None,
+        pattern: int = None,
+    ):
+        """ Append a block of edges. wt defaults to 1. If pattern is given, all edges of the
+        block are marked as members of that pattern.
+        """
+        head = np.asarray(head, dtype=self.dtypes['head'])
+        n_new = head.shape[0]
+        if n_new == 0:
+            return
+        if self.n_edges + n_new > self.capacity:
+            while self.n_edges + n_new > self.capacity:
+                self.capacity *= 2
+            grow(self.columns, self.n_edges, self.capacity)
+        block = slice(self.n_edges, self.n_edges + n_new)
+        self.columns['head'][block] = head
+        self.columns['rel'][block] = rel
+        self.columns['tail'][block] = tail
+        self.columns['t'][block] = t
+        self.columns['wt'][block] = 1 if wt is None else wt
+        if pattern is not None:
+            if self.n_pairs + n_new > self.pair_capacity:
+                while self.n_pairs + n_new > self.pair_capacity:
+                    self.pair_capacity *= 2
+                grow(self.pairs, self.n_pairs, self.pair_capacity)
+            pair_block = slice(self.n_pairs, self.n_pairs + n_new)
+            self.pairs['edge'][pair_block] = np.arange(block.start, block.stop)
+            self.pairs['pattern'][pair_block] = pattern
+            self.n_pairs += n_new
+        self.n_edges += n_new
+
+    def pop_before(self, t_end: int) -> 'Tuple[pd.DataFrame,PatternMembership]':
+        """ Remove the edges before time window t_end from the store and return them, along
+        with their pattern membership. Remaining edges keep their order.
+        """
+        is_popped = self['t'] < t_end
+        membership = self.membership()
+        popped = pd.DataFrame({col: self[col][is_popped] for col in self.dtypes})
+        popped_membership = membership.take(is_popped)
+        kept = np.flatnonzero(~is_popped)
+        kept_membership = membership.take(kept)
+        for col in self.dtypes:
+            self.columns[col][:kept.shape[0]] = self[col][kept]
+        self.n_edges = kept.shape[0]
+        self.n_pairs = kept_membership.ids.shape[0]
+        self.pairs['edge'][:self.n_pairs] = kept_membership.edge_idxs()
+        self.pairs['pattern'][:self.n_pairs] = kept_membership.ids
+        return popped, popped_membership
+
+    def membership(self) -> PatternMembership:
+        """ Return pattern membership of all edges in the store
+        """
+        return PatternMembership.from_pairs(
+            self.n_edges,
+            self.pairs['edge'][:self.n_pairs],
+            self.pairs['pattern'][:self.n_pairs],
+        )
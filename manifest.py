@@ -0,0 +1,109 @@
+import hashlib
+import inspect
+import json
+import os
+
+
+# Files every run exports to its directory
+RUN_FILES = [
+    'entity2id.txt',
+    'relation2id.txt',
+    'timestamp2id.txt',
+    'pattern2id.txt',
+    'stat.txt',
+    'train.txt',
+    'valid.txt',
+    'test.txt',
+    'config.py',
+]
+
+
+def describe_value(value) -> str:
+    """ Return a stable text description of a config value. Functions are described by their
+    source code, since their repr changes between processes.
+    """
+    if callable(value):
+        try:
+            return inspect.getsource(value).strip()
+        except (OSError, TypeError):
+            return getattr(value, '__qualname__', repr(value))
+    if isinstance(value, dict):
+        return '{' + ', '.join(
+            f'{describe_value(key)}: {describe_value(val)}' for key, val in sorted(value.items())
+        ) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(describe_value(val) for val in value) + ']'
+    return repr(value)
+
+def config_hash(config: 'Dict[str,]') -> str:
+    """ Hash of a configuration, used to detect runs created by a different configuration
+    """
+    return hashlib.sha256(describe_value(config).encode()).hexdigest()
+
+def file_checksum(path: str) -> str:
+    """ SHA-256 checksum of the file at path
+    """
+    checksum = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+def checksum_run(run_dir: str) -> 'Dict[str,str]':
+    """ Checksums of all files exported by a run
+    """
+    return {name: file_checksum(os.path.join(run_dir, name)) for name in RUN_FILES}
+
+
+class RunManifest():
+    def __init__(self, export_dir: str):
+        """ Manifest of the runs in an export directory, recording for each run the hash of
+        the config that created it, its seed, its status and the checksums of its output
+        files. Used to skip complete runs when a sweep is resumed.
+        Args:
+            export_dir (str): Export directory of a config, containing one directory per run
+        """
+        self.export_dir = export_dir
+        self.path = os.path.join(export_dir, 'manifest.json')
+        self.runs = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.runs = json.load(f)['runs']
+
+    def is_complete(self, run_id: int, config: 'Dict[str,]') -> bool:
+        """ Indicate whether run_id was completed with config and its outputs are unchanged
+        """
+        entry = self.runs.get(str(run_id))
+        if (entry is None) or (entry['status'] != 'complete') or \
+                (entry['config_hash'] != config_hash(config)):
+            return False
+        run_dir = os.path.join(self.export_dir, f'run_{run_id}')
+        for name, checksum in entry['checksums'].items():
+            path = os.path.join(run_dir, name)
+            if (not os.path.exists(path)) or (file_checksum(path) != checksum):
+                return False
+        return True
+
+    def start(self, run_id: int, config: 'Dict[str,]', seed: int = None):
+        """ Record that run_id has been scheduled
+        """
+        self.runs[str(run_id)] = {
+            'config_hash': config_hash(config),
+            'seed': seed,
+            'status': 'running',
+            'checksums': {},
+        }
+
+    def complete(self, run_id: int, checksums: 'Dict[str,str]'):
+        """ Record that run_id finished, along with the checksums of its outputs
+        """
+        self.runs[str(run_id)]['status'] = 'complete'
+        self.runs[str(run_id)]['checksums'] = checksums
+
+    def save(self):
+        """ Write the manifest, replacing the previous one atomically
+        """
+        os.makedirs(self.export_dir, exist_ok=True)
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump({'runs': self.runs}, f, indent=2, sort_keys=True)
+        os.replace(self.path + '.tmp', self.path)
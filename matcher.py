@@ -0,0 +1,239 @@
+import numpy as np
+
+from bisect import bisect_left
+from collections import defaultdict
+
+from edgestore import grow
+from patterntable import PatternTable
+from tripleset import TripleSet
+from utils import any_in_range
+
+
+class PatternMatcher():
+    def __init__(self, pattern_table: PatternTable, fire_consequences: bool = False):
+        """ Matches many temporal patterns at once over a stream of edges sorted by time window.
+        The matcher records the time windows and ids of the edges of every triple of a pattern,
+        and once all windows are ingested, joins them per pattern, see satisfying_idxs.
+        With fire_consequences, the matcher instead drives pattern application: it only tracks
+        antecedents, and whenever a chain of antecedents completes it schedules the pattern for
+        the time windows its consequence may follow in, see fire.
+        Args:
+            pattern_table (PatternTable): Patterns to match
+            fire_consequences (bool): Whether to schedule consequences of complete antecedent
+                chains, instead of matching whole patterns, default False
+        """
+        self.fire_consequences = fire_consequences
+        self.time_lags = [pattern_table.lags(idx) for idx in range(len(pattern_table))]
+        # In fire mode, patterns are laid out as paths in a trie of their antecedent chains,
+        # where node i at step k stands for a chain of k+1 triples and the time lags between
+        # them. Patterns sharing a prefix share its nodes, and with them the partial-match state
+        # of the prefix.
+        # Chain key -> node, and per node its parent (-1 for step 0) and the time lag from it
+        self.nodes = {}
+        self.parents = []
+        self.lags = []
+        # Triple -> (step, node) pairs the triple can advance
+        subscriptions = defaultdict(list)
+        # Per node, the patterns it completes the antecedents of with their consequence lag,
+        # and whether chains through it go on to a further step
+        self.completes = []
+        self.extends = []
+        # Per node, the largest time lag to any of its children, after which its chains expire
+        self.horizons = []
+        for pat_idx in range(len(pattern_table) if fire_consequences else 0):
+            path = []
+            key = ()
+            for step, triple in enumerate(pattern_table.triples(pat_idx)[:-1]):
+                lag = tuple(self.time_lags[pat_idx][step-1]) if step > 0 else None
+                key = key + (lag, triple)
+                if key not in self.nodes:
+                    self.nodes[key] = len(self.parents)
+                    self.parents.append(path[-1] if path else -1)
+                    self.lags.append(lag)
+                    self.completes.append([])
+                    self.extends.append(False)
+                    self.horizons.append(0)
+                    subscriptions[triple].append((step, self.nodes[key]))
+                node = self.nodes[key]
+                if path:
+                    self.extends[path[-1]] = True
+                    self.horizons[path[-1]] = max(self.horizons[path[-1]], lag[1])
+                path.append(node)
+            self.completes[path[-1]].append((pat_idx, tuple(self.time_lags[pat_idx][-1])))
+        # Packed set of the subscribed triples, so the edges of a window that can advance some
+        # pattern are found in one call. Edges with ids beyond those of any pattern never match,
+        # so keys only need to cover these
+        all_triples = pattern_table.all_triples()
+        n_ents = int(all_triples[:, [0, 2]].max(initial=-1))+1
+        n_rels = int(all_triples[:, 1].max(initial=-1))+1
+        self.subscribed = TripleSet(n_ents, n_rels)
+        if fire_consequences:
+            triples = np.array(list(subscriptions), dtype=np.int64).reshape(-1, 3)
+        else:
+            triples = all_triples
+        self.subscribed.add(triples[:, 0], triples[:, 1], triples[:, 2])
+        # Per rank of a triple in subscribed, the (step, node) pairs it can advance
+        self.subscriptions = [[] for _ in range(len(self.subscribed))]
+        for rank, triple in zip(self.subscribed.find(*triples.T).tolist(), triples.tolist()):
+            self.subscriptions[rank] = subscriptions[tuple(triple)]
+        # Per pattern, the ranks of its triples in subscribed, in order of steps
+        self.pattern_ranks = [] if fire_consequences else [
+            self.subscribed.find(*np.array(pattern_table.triples(idx), dtype=np.int64).T)
+            for idx in range(len(pattern_table))
+        ]
+        # Partial-match state, per node
+        self.reached = [[] for _ in self.parents]
+        # Time window -> indices of patterns whose consequence is due in it
+        self.calendar = defaultdict(set)
+        # Occurrences of subscribed triples, as ranks, time windows and edge ids, kept in
+        # preallocated arrays which double in size when full, as in EdgeStore
+        self.n_occurrences = 0
+        self.occurrences = {
+            'rank': np.empty(1024, dtype=np.int64),
+            't': np.empty(1024, dtype=np.int64),
+            'id': np.empty(1024, dtype=np.int64),
+        }
+
+    def _expire(self, node: int, t: int):
+        """ Drop the chains ending at node that no child can extend in time window t or later.
+        Windows are ingested in increasing order, so these can never be extended again.
+        """
+        ts = self.reached[node]
+        pos = bisect_left(ts, t-self.horizons[node])
+        if pos > 0:
+            del ts[:pos]
+
+    def _advance(self, node: int, t: int) -> bool:
+        """ Indicate whether a partial chain of the parent of node can be extended to node in
+        time window t
+        """
+        parent = self.parents[node]
+        if parent == -1:
+            return True
+        lag_min, lag_max = self.lags[node]
+        self._expire(parent, t)
+        prev_ts = self.reached[parent]
+        # Some previous step must lie in [t-lag_max, t-lag_min]
+        pos = bisect_left(prev_ts, t-lag_max)
+        return (pos < len(prev_ts)) and (prev_ts[pos] <= t-lag_min)
+
+    def ingest(
+        self,
+        t: int,
+        heads: 'Iterable[int]',
+        rels: 'Iterable[int]',
+        tails: 'Iterable[int]',
+        ids: 'Iterable[int]' = None,
+    ):
+        """ Advance partial matches with the edges of time window t. Windows must be ingested in
+        increasing order. Edge ids default to -1.
+        """
+        # Only edges of subscribed triples can advance a pattern
+        ranks = self.subscribed.find(heads, rels, tails)
+        is_hit = ranks >= 0
+        if not self.fire_consequences:
+            self._record(t, ranks[is_hit], -1 if ids is None else np.asarray(ids)[is_hit])
+            return
+        hits = []
+        for rank in ranks[is_hit].tolist():
+            hits.extend(self.subscriptions[rank])
+        # Earlier steps go first, so steps with a time lag of 0 see the same window
+        hits.sort()
+        # Whether each node can be advanced in window t, shared by all edges of its triple.
+        # Parents are at earlier steps, so they are final by the time a node is looked up
+        is_advanced = {}
+        for step, node in hits:
+            if node not in is_advanced:
+                is_advanced[node] = self._advance(node, t)
+            if not is_advanced[node]:
+                continue
+            # Antecedents are complete, schedule the consequences
+            for pat_idx, (lag_min, lag_max) in self.completes[node]:
+                for t_due in range(t+lag_min, t+lag_max+1):
+                    self.calendar[t_due].add(pat_idx)
+            if not self.extends[node]:
+                continue
+            # Expire chains here as well, since the children of node may never be looked up,
+            # so state stays bounded by the edges of recent windows
+            self._expire(node, t)
+            self.reached[node].append(t)
+
+    def _record(self, t: int, ranks: np.ndarray, ids: np.ndarray):
+        """ Append occurrences of subscribed triples in time window t
+        """
+        n_new = ranks.shape[0]
+        capacity = self.occurrences['t'].shape[0]
+        if self.n_occurrences + n_new > capacity:
+            while self.n_occurrences + n_new > capacity:
+                capacity *= 2
+            grow(self.occurrences, self.n_occurrences, capacity)
+        block = slice(self.n_occurrences, self.n_occurrences + n_new)
+        self.occurrences['rank'][block] = ranks
+        self.occurrences['t'][block] = t
+        self.occurrences['id'][block] = ids
+        self.n_occurrences += n_new
+
+    def fire(self, t: int) -> 'List[int]':
+        """ Return the sorted indices of patterns whose antecedents are satisfied for a
+        consequence in time window t, given all windows before t have been ingested
+        """
+        return sorted(self.calendar.pop(t, ()))
+
+    def satisfying_idxs(self) -> 'List[List[int]]':
+        """ Return, per pattern, the ids of edges that take part in a complete occurrence of it,
+        i.e. in a chain of antecedents followed by the consequence in which every step respects
+        its time lag. Each chain is joined over the sorted time windows of its triples, planned
+        by selectivity: the join starts from the triple of the pattern with the fewest edges and
+        expands from it in both directions, so every intermediate set is bounded by the edges of
+        that triple. Forward and backward passes over the reduced sets then keep the windows
+        that are reachable from the first antecedent and also lead on to the consequence.
+        """
+        # Group occurrences by triple, keeping them in order of time windows
+        ranks = self.occurrences['rank'][:self.n_occurrences]
+        order = np.argsort(ranks, kind='stable')
+        counts = np.bincount(ranks, minlength=len(self.subscribed))
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        occ_ts = self.occurrences['t'][:self.n_occurrences][order]
+        occ_ids = self.occurrences['id'][:self.n_occurrences][order]
+        all_idxs = []
+        for time_lags, pattern_ranks in zip(self.time_lags, self.pattern_ranks):
+            pattern_counts = counts[pattern_ranks]
+            if pattern_counts.min() == 0:
+                # Some triple never occurred, so neither did the pattern
+                all_idxs.append([])
+                continue
+            all_ts = [occ_ts[offsets[rank]:offsets[rank+1]] for rank in pattern_ranks]
+            # Anchor the join at the least frequent triple
+            anchor = int(np.argmin(pattern_counts))
+            reached = [None]*len(all_ts)
+            reached[anchor] = np.unique(all_ts[anchor])
+            # Expand towards the consequence, keeping windows that follow the previous step
+            for idx in range(anchor+1, len(all_ts)):
+                ts = np.unique(all_ts[idx])
+                time_lag = time_lags[idx-1]
+                reached[idx] = ts[any_in_range(reached[idx-1], ts-time_lag[1], ts-time_lag[0])]
+            # Expand towards the first antecedent, keeping windows that lead on to the next step
+            for idx in range(anchor-1, -1, -1):
+                ts = np.unique(all_ts[idx])
+                time_lag = time_lags[idx]
+                reached[idx] = ts[any_in_range(reached[idx+1], ts+time_lag[0], ts+time_lag[1])]
+            if any(ts.shape[0] == 0 for ts in reached):
+                # No occurrence of the pattern
+                all_idxs.append([])
+                continue
+            # Forward pass: only keep time windows that complete a valid partial chain
+            for idx in range(1, len(reached)):
+                time_lag = time_lags[idx-1]
+                reached[idx] = reached[idx][any_in_range(
+                    reached[idx-1], reached[idx]-time_lag[1], reached[idx]-time_lag[0])]
+            # Backward pass: only keep time windows from which the rest of the chain is reachable
+            for idx in range(len(reached)-2, -1, -1):
+                time_lag = time_lags[idx]
+                reached[idx] = reached[idx][any_in_range(
+                    reached[idx+1], reached[idx]+time_lag[0], reached[idx]+time_lag[1])]
+            idxs = [
+                occ_ids[offsets[rank]:offsets[rank+1]][np.isin(ts, kept)]
+                for rank, ts, kept in zip(pattern_ranks, all_ts, reached)
+            ]
+            all_idxs.append(np.unique(np.concatenate(idxs)).tolist())
+        return all_idxs
@@ -0,0 +1,89 @@
+import numpy as np
+
+
+class PatternMembership():
+    def __init__(self, offsets: np.ndarray, ids: np.ndarray):
+        """ Compact, CSR-style store of the patterns each edge belongs to. The pattern ids of
+        edge i are ids[offsets[i]:offsets[i+1]], sorted and without duplicates.
+        Args:
+            offsets (np.ndarray): Start of each edge's pattern ids in ids, of length
+                (# of edges)+1
+            ids (np.ndarray): Concatenated pattern ids of all edges
+        """
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.ids = np.asarray(ids, dtype=np.int32)
+
+    @classmethod
+    def from_pairs(
+        cls, n_edges: int, edge_idxs: 'Iterable[int]', pattern_ids: 'Iterable[int]'
+    ) -> 'PatternMembership':
+        """ Create membership from (edge index, pattern id) pairs, which may contain duplicates
+        """
+        edge_idxs = np.asarray(edge_idxs, dtype=np.int64)
+        pattern_ids = np.asarray(pattern_ids, dtype=np.int32)
+        # Sort pairs by edge, then pattern id, and drop duplicate pairs
+        order = np.lexsort((pattern_ids, edge_idxs))
+        edge_idxs, pattern_ids = edge_idxs[order], pattern_ids[order]
+        unique = np.ones(edge_idxs.shape[0], dtype=bool)
+        unique[1:] = (edge_idxs[1:] != edge_idxs[:-1]) | (pattern_ids[1:] != pattern_ids[:-1])
+        edge_idxs, pattern_ids = edge_idxs[unique], pattern_ids[unique]
+        offsets = np.zeros(n_edges+1, dtype=np.int64)
+        np.cumsum(np.bincount(edge_idxs, minlength=n_edges), out=offsets[1:])
+        return cls(offsets, pattern_ids)
+
+    def __len__(self) -> int:
+        return self.offsets.shape[0]-1
+
+    def counts(self) -> np.ndarray:
+        """ Return number of patterns per edge
+        """
+        return np.diff(self.offsets)
+
+    def edge_idxs(self) -> np.ndarray:
+        """ Return the edge index of every entry of ids
+        """
+        return np.repeat(np.arange(len(self)), self.counts())
+
+    def take(self, idxs: np.ndarray) -> 'PatternMembership':
+        """ Return membership of the edges selected by idxs, an array of indices or a boolean
+        mask
+        """
+        idxs = np.arange(len(self))[idxs]
+        counts = self.counts()[idxs]
+        offsets = np.zeros(idxs.shape[0]+1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        # Position in ids of every selected entry
+        positions = np.repeat(self.offsets[idxs] - offsets[:-1], counts) + \
+            np.arange(offsets[-1])
+        return PatternMembership(offsets, self.ids[positions])
+
+    def union(self, other: 'PatternMembership') -> 'PatternMembership':
+        """ Return edge-wise union with the membership of the same edges in other
+        """
+        return PatternMembership.from_pairs(
+            len(self),
+            np.concatenate([self.edge_idxs(), other.edge_idxs()]),
+            np.concatenate([self.ids, other.ids]),
+        )
+
+    def reduce(self, group_idxs: np.ndarray, n_groups: int) -> 'PatternMembership':
+        """ Return membership of groups of edges, as the union over the edges of every group.
+        group_idxs holds the group of each edge.
+        """
+        return PatternMembership.from_pairs(
+            n_groups, np.asarray(group_idxs)[self.edge_idxs()], self.ids)
+
+    def to_labels(self) -> 'List[str]':
+        """ Serialize to one '[id, ...]' string per edge
+        """
+        counts = self.counts()
+        # Every edge becomes its ids followed by one closing piece, all laid out in order
+        pieces = np.empty(self.ids.shape[0]+len(self), dtype=object)
+        id_positions = np.arange(self.ids.shape[0]) + self.edge_idxs()
+        is_first = np.zeros(self.ids.shape[0], dtype=bool)
+        is_first[self.offsets[:-1][counts > 0]] = True
+        pieces[id_positions] = \
+            np.where(is_first, '[', ', ').astype(object) + self.ids.astype(str).astype(object)
+        pieces[self.offsets[1:] + np.arange(len(self))] = \
+            np.where(counts > 0, ']\n', '[]\n').astype(object)
+        return ''.join(pieces).split('\n')[:-1]
@@ -1,155 +1,159 @@
-import pandas as pd
-
-import random
+import numpy as np
 
+from aliassampler import AliasSampler
 from temporalpattern import TemporalPattern
-from utils import entities_intersect, \
-    entities_connect_triples, \
-    entities_connect_components, \
-    force_swap_to_entities, \
-    force_connect_components, \
+from utils import isin_rows, \
+    entities_intersect_rows, \
+    force_swap_to_entities_batch, \
+    force_connect_components_batch, \
     create_time_lag_tuples
 
 
-def create_1_hop_pattern(
-    entity2id: pd.DataFrame,
-    relation2id: pd.DataFrame,
-    time_lags: 'List[Tuple(float,float)]',
-    seed: int = None,
-) -> TemporalPattern:
-    """ Create a 1-hop temporal pattern
+def sample_pattern_ids(
+    entity_sampler: AliasSampler,
+    relation_sampler: AliasSampler,
+    n: int,
+    n_hops: int,
+    rng: np.random.Generator = None,
+) -> 'Tuple[np.ndarray,np.ndarray]':
+    """ Sample the initial entities and relations of n candidate patterns with n_hops hops,
+    as matrices of shape (n, 2*(n_hops+1)) and (n, n_hops+1)
+    """
+    rng = np.random.default_rng(rng)
+    sampled_entities = entity_sampler.draw((n, 2*(n_hops+1)), rng)
+    sampled_relations = relation_sampler.draw((n, n_hops+1), rng)
+    return sampled_entities, sampled_relations
+
+def patterns_from_samples(
+    sampled_entities: np.ndarray,
+    sampled_relations: np.ndarray,
+    time_lags: 'List[Tuple(int,int)]',
+    rng: np.random.Generator = None,
+) -> 'List[TemporalPattern]':
+    """ Create one pattern per row of the entity and relation sample matrices, where
+    triple i of a row is (entity 2i, relation i, entity 2i+1) and the last triple is the
+    consequence
+    """
+    n_hops = sampled_relations.shape[1]-1
+    triples = np.stack([
+        sampled_entities[:, 0::2], sampled_relations, sampled_entities[:, 1::2],
+    ], axis=2)
+    time_lags = create_time_lag_tuples(time_lags, triples[:, :-1], rng)
+    patterns = []
+    for pattern_triples, pattern_time_lags in zip(triples.tolist(), time_lags.tolist()):
+        patterns.append(TemporalPattern(
+            antecedent=pattern_triples[:-1],
+            consequence=pattern_triples[-1],
+            time_lags=pattern_time_lags,
+            n_hops=n_hops,
+        ))
+    return patterns
+
+def create_1_hop_patterns(
+    entity_sampler: AliasSampler,
+    relation_sampler: AliasSampler,
+    time_lags: 'List[Tuple(int,int)]',
+    n: int,
+    rng: np.random.Generator = None,
+) -> 'List[TemporalPattern]':
+    """ Create n 1-hop temporal patterns
     (e1, r1, e2, t1) → (e3, r2, e4, t2)
     Such that:
         - e3 and e4 \in {e1, e2}
         - t2 > t1
+    Entities and relations of all patterns are sampled at once and constraints are applied
+    to all rows of the sample matrices that violate them.
     Args:
-        entity2id (pd.DataFrame): Dataframe with entity ids in column 'id'
-        relation2id (pd.DataFrame): Dataframe with relation ids in column 'id'
-        time_lags (List[float]): Time lags with which antecedents and consequences
-            can occur validly. Either a list of float tuples or of functions that
-            can create such floats when called.
-        seed (int): Random seed, default None
+        entity_sampler (AliasSampler): Sampler of entity ids by weight
+        relation_sampler (AliasSampler): Sampler of relation ids by weight
+        time_lags (List[Tuple(int,int)]): Time lags with which antecedents and consequences
+            can occur validly. A list of tuples of bounds, each either an integer or a
+            Distribution (or function) drawing such integers for all n patterns at once.
+        n (int): Number of patterns to create
+        rng (np.random.Generator): Random number generator, or seed to create one from,
+            default None
     """
-    random.seed(seed)
+    rng = np.random.default_rng(rng)
     # Randomly select all initial entities and relations to be used
-    sampled_entities = entity2id.sample(
-        4, weights='wt', replace=True, random_state=seed)['id'].tolist()
-    sampled_relations = relation2id.sample(
-        2, weights='wt', replace=True, random_state=seed)['id'].tolist()
-    # Define antecedent
-    antecedent = [
-        (
-            sampled_entities[0],  # e1
-            sampled_relations[0],  # r1
-            sampled_entities[1],  # e2
-        )
-    ]
+    sampled_entities, sampled_relations = sample_pattern_ids(
+        entity_sampler, relation_sampler, n, 1, rng)
 
     # Consquence must satisfy the constraint that both of its entities are in
     # some antecedent
-    if sampled_entities[2] not in sampled_entities[:2]:
+    for idx in [2, 3]:
         # Force consequent entity to switch to an antecedent entity
-        force_swap_to_entities([2], sampled_entities, sampled_entities[:2], seed)
-    if sampled_entities[3] not in sampled_entities[:2]:
-        force_swap_to_entities([3], sampled_entities, sampled_entities[:2], seed)
+        force_swap_to_entities_batch(
+            ~isin_rows(sampled_entities[:, idx], sampled_entities[:, :2]),
+            [idx], sampled_entities, [0, 1], rng,
+        )
     # Consequence must have a relation in some antecedent
-    if sampled_relations[1] not in sampled_relations[:1]:
-        force_swap_to_entities([1], sampled_relations, sampled_relations[:1], seed)
-    
-    consequence = (
-        sampled_entities[2],  # e3
-        sampled_relations[1],  # r2
-        sampled_entities[3],  # e4
+    force_swap_to_entities_batch(
+        ~isin_rows(sampled_relations[:, 1], sampled_relations[:, :1]),
+        [1], sampled_relations, [0], rng,
     )
 
-    time_lag_tuples = create_time_lag_tuples(time_lags, antecedent)
-
-    return TemporalPattern(
-        antecedent=antecedent,
-        consequence=consequence,
-        time_lags=time_lag_tuples,
-        n_hops=1,
-    )
+    return patterns_from_samples(sampled_entities, sampled_relations, time_lags, rng)
 
-def create_2_hop_pattern(
-    entity2id: pd.DataFrame,
-    relation2id: pd.DataFrame,
-    time_lags: 'List[Tuple(float,float)]',
-    seed: int = None,
-) -> TemporalPattern:
-    """ Create a 2-hop temporal pattern
+def create_2_hop_patterns(
+    entity_sampler: AliasSampler,
+    relation_sampler: AliasSampler,
+    time_lags: 'List[Tuple(int,int)]',
+    n: int,
+    rng: np.random.Generator = None,
+) -> 'List[TemporalPattern]':
+    """ Create n 2-hop temporal patterns
     (e1, r1, e2, t1) & (e3, r2, e4, t2) → (e5, r3, e6, t3)
     Such that:
         - (e3 or e4 \in {e1, e2}) and (e5 and e6 \in {e1, e2, e3, e4})
         - t3 > t2 >= t1
         - (e1, r1, e2, t1) != (e3, r2, e4, t2)
+    Entities and relations of all patterns are sampled at once and constraints are applied
+    to all rows of the sample matrices that violate them.
 
     Args:
-        entity2id (pd.DataFrame): Dataframe with entity ids in column 'id'
-        relation2id (pd.DataFrame): Dataframe with relation ids in column 'id'
-        time_lags (List[float]): Time lags with which antecedents and consequences
-            can occur validly. Either a list of float tuples or of functions that
-            can create such floats when called.
-        seed (int): Random seed, default None
+        entity_sampler (AliasSampler): Sampler of entity ids by weight
+        relation_sampler (AliasSampler): Sampler of relation ids by weight
+        time_lags (List[Tuple(int,int)]): Time lags with which antecedents and consequences
+            can occur validly. A list of tuples of bounds, each either an integer or a
+            Distribution (or function) drawing such integers for all n patterns at once.
+        n (int): Number of patterns to create
+        rng (np.random.Generator): Random number generator, or seed to create one from,
+            default None
     """
-    random.seed(seed)
+    rng = np.random.default_rng(rng)
     # Randomly select all initial entities and relations to be used
-    sampled_entities = entity2id.sample(
-        6, weights='wt', replace=True, random_state=seed)['id'].tolist()
-    sampled_relations = relation2id.sample(
-        3, weights='wt', replace=True, random_state=seed)['id'].tolist()
-    
-    if ~entities_intersect(sampled_entities[2:4], sampled_entities[:2]):
-        # Force the second antecedent to intersect the first
-        force_swap_to_entities([2,3], sampled_entities, sampled_entities[:2], seed)
-    
-    # Define antecedent
-    antecedent = [
-        (
-            sampled_entities[0],  # e1
-            sampled_relations[0],  # r1
-            sampled_entities[1],  # e2
-        ),
-        (
-            sampled_entities[2],  # e3
-            sampled_relations[1],  # r2
-            sampled_entities[3],  # e4
-        )
-    ]
-    
+    sampled_entities, sampled_relations = sample_pattern_ids(
+        entity_sampler, relation_sampler, n, 2, rng)
+
+    # Force the second antecedent to intersect the first
+    force_swap_to_entities_batch(
+        ~entities_intersect_rows(sampled_entities[:, 2:4], sampled_entities[:, :2]),
+        [2, 3], sampled_entities, [0, 1], rng,
+    )
+
     # Consquence must have both of its entities in some antecedent
-    if sampled_entities[4] not in sampled_entities[:4]:
+    for idx in [4, 5]:
         # Force consequent entity to switch to an antecedent entity
-        force_swap_to_entities([4], sampled_entities, sampled_entities[:4], seed)
-    if sampled_entities[5] not in sampled_entities[:4]:
-        force_swap_to_entities([5], sampled_entities, sampled_entities[:4], seed)
+        force_swap_to_entities_batch(
+            ~isin_rows(sampled_entities[:, idx], sampled_entities[:, :4]),
+            [idx], sampled_entities, [0, 1, 2, 3], rng,
+        )
     # Consequence must have a relation in some antecedent
-    if sampled_relations[2] not in sampled_relations[:2]:
-        force_swap_to_entities([2], sampled_relations, sampled_relations[:2], seed)
-    
-    # Define consequence
-    consequence = (
-        sampled_entities[4],  # e5
-        sampled_relations[2],  # r3
-        sampled_entities[5],  # e6
+    force_swap_to_entities_batch(
+        ~isin_rows(sampled_relations[:, 2], sampled_relations[:, :2]),
+        [2], sampled_relations, [0, 1], rng,
     )
 
-    time_lag_tuples = create_time_lag_tuples(time_lags, antecedent)
-    
-    return TemporalPattern(
-        antecedent=antecedent,
-        consequence=consequence,
-        time_lags=time_lag_tuples,
-        n_hops=2,
-    )
+    return patterns_from_samples(sampled_entities, sampled_relations, time_lags, rng)
 
-def create_3_hop_pattern(
-    entity2id: pd.DataFrame,
-    relation2id: pd.DataFrame,
-    time_lags: 'List[Tuple(float,float)]',
-    seed: int = None,
-) -> TemporalPattern:
-    """ Create a 3-hop temporal pattern
+def create_3_hop_patterns(
+    entity_sampler: AliasSampler,
+    relation_sampler: AliasSampler,
+    time_lags: 'List[Tuple(int,int)]',
+    n: int,
+    rng: np.random.Generator = None,
+) -> 'List[TemporalPattern]':
+    """ Create n 3-hop temporal patterns
     (e1, r1, e2, t1) & (e3, r2, e4, t2) & (e5, r3, e6, t3) → (e7, r4, e8, t4)
     Such that:
         - All antecedents intersect sequentially: (e3 or e4 \in {e1, e2}) and (e5 or e6 \in {e1, e2, e3, e4}) and (e7 and e8 \in {e1, e2, e3, e4, e5, e6})
@@ -157,88 +161,58 @@ def create_3_hop_pattern(
         - Third antecedent connects them: ((e5 \in {e1, e2} and e6 \in {e3, e4}) or (e5 \in {e3, e4} and e6 \in {e1, e2})) then (e7 or e8 \in {e1, e2, e3, e4, e5, e6}),
         - t4 > t3 >= t2 >= t1
         - (e1, r1, e2, t1) != (e3, r2, e4, t2) and (e1, r1, e2, t1) != (e5, r3, e6, t3) and (e1, r1, e2, t1) != (e3, r2, e4, t2)
+    Entities and relations of all patterns are sampled at once and constraints are applied
+    to all rows of the sample matrices that violate them.
 
     Args:
-        entity2id (pd.DataFrame): Dataframe with entity ids in column 'id'
-        relation2id (pd.DataFrame): Dataframe with relation ids in column 'id'
-        time_lags (List[float]): Time lags with which antecedents and consequences
-            can occur validly. Either a list of float tuples or of functions that
-            can create such floats when called.
-        seed (int): Random seed, default None
+        entity_sampler (AliasSampler): Sampler of entity ids by weight
+        relation_sampler (AliasSampler): Sampler of relation ids by weight
+        time_lags (List[Tuple(int,int)]): Time lags with which antecedents and consequences
+            can occur validly. A list of tuples of bounds, each either an integer or a
+            Distribution (or function) drawing such integers for all n patterns at once.
+        n (int): Number of patterns to create
+        rng (np.random.Generator): Random number generator, or seed to create one from,
+            default None
     """
-    random.seed(seed)
+    rng = np.random.default_rng(rng)
     # Randomly select all initial entities and relations to be used
-    sampled_entities = entity2id.sample(
-        8, weights='wt', replace=True, random_state=seed)['id'].tolist()
-    sampled_relations = relation2id.sample(
-        4, weights='wt', replace=True, random_state=seed)['id'].tolist()
-    
+    sampled_entities, sampled_relations = sample_pattern_ids(
+        entity_sampler, relation_sampler, n, 3, rng)
+
     # Note: This check on the third antecedent can be moved after the check on the
     # intersection of the first and second antecedents, since that one also modified
     # the third antecedent.
     # Third antecedent must intersect at least one prior antecedent
-    if ~entities_intersect(sampled_entities[:4], sampled_entities[4:6]):
-        # Enforce that the third antecedent include entities from at least one prior
-        # antecedent
-        force_swap_to_entities([4,5], sampled_entities, sampled_entities[:4], seed)
+    # Enforce that the third antecedent include entities from at least one prior
+    # antecedent
+    force_swap_to_entities_batch(
+        ~entities_intersect_rows(sampled_entities[:, :4], sampled_entities[:, 4:6]),
+        [4, 5], sampled_entities, [0, 1, 2, 3], rng,
+    )
     # Second antecedent must intersect first or they must be connected by third antecedent
-    if ~entities_intersect(sampled_entities[2:4], sampled_entities[:2]):
-        # Second antecedent does not intersect first antecedent
-        # Enforce that the third antecedent connects them
-        if not entities_connect_triples(
-            sampled_entities[4], sampled_entities[5],
-            (sampled_entities[0], sampled_relations[0], sampled_entities[1]),
-            (sampled_entities[2], sampled_relations[1], sampled_entities[3]),
-        ):
-            # Third antecedent must connect prior antecedents
-            force_connect_components(
-                [4,5], sampled_entities,
-                sampled_entities[:2],
-                sampled_entities[2:4],
-                seed,
-            )
-    
-    # Define antecedent
-    antecedent = [
-        (
-            sampled_entities[0],  # e1
-            sampled_relations[0],  # r1
-            sampled_entities[1],  # e2
-        ),
-        (
-            sampled_entities[2],  # e3
-            sampled_relations[1],  # r2
-            sampled_entities[3],  # e4
-        ),
-        (
-            sampled_entities[4],  # e5
-            sampled_relations[2],  # r3
-            sampled_entities[5],  # e6
-        ),
-    ]
-    
+    is_disconnected = ~entities_intersect_rows(
+        sampled_entities[:, 2:4], sampled_entities[:, :2])
+    # Third antecedent must connect prior antecedents
+    e5_in_first = isin_rows(sampled_entities[:, 4], sampled_entities[:, :2])
+    e5_in_second = isin_rows(sampled_entities[:, 4], sampled_entities[:, 2:4])
+    e6_in_first = isin_rows(sampled_entities[:, 5], sampled_entities[:, :2])
+    e6_in_second = isin_rows(sampled_entities[:, 5], sampled_entities[:, 2:4])
+    is_connected = (e5_in_first & e6_in_second) | (e6_in_first & e5_in_second)
+    force_connect_components_batch(
+        is_disconnected & ~is_connected, [4, 5], sampled_entities, [0, 1], [2, 3], rng,
+    )
+
     # Consequence must have both of its entities in some antecedent
-    if sampled_entities[6] not in sampled_entities[:6]:
+    for idx in [6, 7]:
         # Force consequent entity to switch to an antecedent entity
-        force_swap_to_entities([6], sampled_entities, sampled_entities[:6], seed)
-    if sampled_entities[7] not in sampled_entities[:6]:
-        force_swap_to_entities([7], sampled_entities, sampled_entities[:6], seed)
+        force_swap_to_entities_batch(
+            ~isin_rows(sampled_entities[:, idx], sampled_entities[:, :6]),
+            [idx], sampled_entities, [0, 1, 2, 3, 4, 5], rng,
+        )
     # Consequence must have a relation in some antecedent
-    if sampled_relations[3] not in sampled_relations[:3]:
-        force_swap_to_entities([3], sampled_relations, sampled_relations[:3], seed)
-    
-    # Define consequence
-    consequence = (
-        sampled_entities[6],  # e7
-        sampled_relations[3],  # r4
-        sampled_entities[7],  # e8
-    )
-    
-    time_lag_tuples = create_time_lag_tuples(time_lags, antecedent)
-
-    return TemporalPattern(
-        antecedent=antecedent,
-        consequence=consequence,
-        time_lags=time_lag_tuples,
-        n_hops=3,
+    force_swap_to_entities_batch(
+        ~isin_rows(sampled_relations[:, 3], sampled_relations[:, :3]),
+        [3], sampled_relations, [0, 1, 2], rng,
     )
+
+    return patterns_from_samples(sampled_entities, sampled_relations, time_lags, rng)
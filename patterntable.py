@@ -0,0 +1,102 @@
+import numpy as np
+
+from temporalpattern import TemporalPattern, parse_labels
+
+
+class PatternTable():
+    def __init__(
+        self,
+        antecedents: np.ndarray,
+        consequences: np.ndarray,
+        time_lags: np.ndarray,
+        n_hops: np.ndarray,
+    ):
+        """ Array-backed table of temporal patterns, compiled once per run and shared by the
+        stages that apply and label patterns. Patterns with fewer hops than the largest one are
+        padded with -1.
+        Args:
+            antecedents (np.ndarray): Antecedent triples, of shape (# of patterns, max # of
+                hops, 3)
+            consequences (np.ndarray): Consequence triples, of shape (# of patterns, 3)
+            time_lags (np.ndarray): Minimum and maximum time lag after each antecedent, of
+                shape (# of patterns, max # of hops, 2)
+            n_hops (np.ndarray): Number of hops of each pattern, of shape (# of patterns,)
+        """
+        self.antecedents = np.asarray(antecedents, dtype=np.int64)
+        self.consequences = np.asarray(consequences, dtype=np.int64)
+        self.time_lags = np.asarray(time_lags, dtype=np.int64)
+        self.n_hops = np.asarray(n_hops, dtype=np.int64)
+
+    @classmethod
+    def from_patterns(cls, patterns: 'List[TemporalPattern]') -> 'PatternTable':
+        """ Compile a list of patterns into a table
+        """
+        max_hops = max([pattern.n_hops for pattern in patterns], default=1)
+        antecedents = np.full((len(patterns), max_hops, 3), -1, dtype=np.int64)
+        consequences = np.full((len(patterns), 3), -1, dtype=np.int64)
+        time_lags = np.full((len(patterns), max_hops, 2), -1, dtype=np.int64)
+        for idx, pattern in enumerate(patterns):
+            antecedents[idx, :pattern.n_hops] = pattern.antecedent
+            consequences[idx] = pattern.consequence
+            time_lags[idx, :pattern.n_hops] = pattern.time_lags
+        return cls(antecedents, consequences, time_lags, [pattern.n_hops for pattern in patterns])
+
+    @classmethod
+    def from_labels(cls, labels: 'Iterable[str]') -> 'PatternTable':
+        """ Parse many pattern labels (as generated by TemporalPattern.__label__), e.g. the
+        pattern column of a pattern2id.txt file, in one pass. All labels are validated and all
+        their integers extracted at once by parse_labels, and gathered into arrays by their
+        position in the label grammar.
+        """
+        labels = list(labels)
+        n_hops, offsets, ints = parse_labels(labels)
+        max_hops = int(n_hops.max(initial=1))
+        antecedents = np.full((len(labels), max_hops, 3), -1, dtype=np.int64)
+        consequences = np.full((len(labels), 3), -1, dtype=np.int64)
+        time_lags = np.full((len(labels), max_hops, 2), -1, dtype=np.int64)
+        # Start of segment 0 (first antecedent) to max_hops (consequence of the longest labels)
+        for seg in range(max_hops+1):
+            has_seg = seg <= n_hops
+            starts = offsets[has_seg] + (0 if seg == 0 else 4+7*(seg-1))
+            triples = ints[starts[:, None] + np.arange(3)]
+            is_consequence = n_hops[has_seg] == seg
+            if seg < max_hops:
+                antecedents[np.flatnonzero(has_seg)[~is_consequence], seg] = \
+                    triples[~is_consequence]
+            consequences[np.flatnonzero(has_seg)[is_consequence]] = triples[is_consequence]
+            if seg > 0:
+                time_lags[has_seg, seg-1] = ints[starts[:, None] + np.arange(5, 7)]
+        return cls(antecedents, consequences, time_lags, n_hops)
+
+    def all_triples(self) -> np.ndarray:
+        """ Return every antecedent and consequence triple of every pattern, of shape
+        (# of triples, 3)
+        """
+        is_hop = np.arange(self.antecedents.shape[1]) < self.n_hops[:, None]
+        return np.concatenate([self.antecedents[is_hop], self.consequences])
+
+    def __len__(self) -> int:
+        return self.n_hops.shape[0]
+
+    def triples(self, idx: int) -> 'List[Tuple[int,int,int]]':
+        """ Return antecedent and consequence triples of pattern idx
+        """
+        n_hops = self.n_hops[idx]
+        return [tuple(triple) for triple in self.antecedents[idx, :n_hops].tolist()] + \
+            [tuple(self.consequences[idx].tolist())]
+
+    def lags(self, idx: int) -> 'List[Tuple[int,int]]':
+        """ Return time lags of pattern idx
+        """
+        return [tuple(time_lag) for time_lag in self.time_lags[idx, :self.n_hops[idx]].tolist()]
+
+    def pattern(self, idx: int) -> TemporalPattern:
+        """ Return pattern idx as a TemporalPattern
+        """
+        triples = self.triples(idx)
+        return TemporalPattern(
+            antecedent=triples[:-1],
+            consequence=triples[-1],
+            time_lags=self.lags(idx),
+            n_hops=int(self.n_hops[idx]),
+        )
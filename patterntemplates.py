@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+import functools
+import os
+
+from aliassampler import AliasSampler
+from patterns import patterns_from_samples
+from utils import isin_rows, \
+    force_swap_to_entities_batch
+
+
+# Directory holding the all_patterns_*_hop.xlsx topology tables
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class PatternTemplates():
+    def __init__(self, roles: np.ndarray, wts: np.ndarray = None):
+        """ Entity-role topologies of patterns with a fixed number of hops, used to instantiate
+        valid patterns directly: a template is sampled and its roles are filled with distinct
+        entities, so no sampled pattern has to be repaired afterwards.
+        Args:
+            roles (np.ndarray): Role of every entity slot of every template, numbered from 0 in
+                order of first appearance, of shape (# of templates, 2*(# of hops+1)). Slots
+                are ordered as the head and tail of each antecedent, then of the consequence
+            wts (np.ndarray): Weights with which templates are sampled, of shape
+                (# of templates,), default None for uniform
+        """
+        self.roles = np.asarray(roles, dtype=np.int64)
+        self.n_hops = self.roles.shape[1]//2 - 1
+        self.n_roles = self.roles.max(axis=1) + 1
+        self.p = None
+        if wts is not None:
+            wts = np.asarray(wts, dtype=np.float64)
+            self.p = wts / wts.sum()
+
+    @classmethod
+    def from_xlsx(cls, path: str, wts=None) -> 'PatternTemplates':
+        """ Load templates from a topology table, with one column per entity slot
+        (antecedent1_h, antecedent1_t, ..., consequence_h, consequence_t) holding role labels
+        e1, e2, .... Note, reading .xlsx files requires openpyxl.
+        Args:
+            path (str): Path to the topology table
+            wts: Weights of the templates, or a function taking the role table and returning
+                them, default None for uniform
+        """
+        table = pd.read_excel(path, dtype=str)
+        roles = np.array(
+            [table[col].str.strip().str[1:].astype(int) - 1 for col in table.columns]
+        ).T
+        if callable(wts):
+            wts = wts(roles)
+        return cls(roles, wts)
+
+    def __len__(self) -> int:
+        return self.roles.shape[0]
+
+    def fill(
+        self,
+        entity_sampler: AliasSampler,
+        n: int,
+        rng: np.random.Generator = None,
+    ) -> np.ndarray:
+        """ Sample n templates and fill their roles with distinct entities, returning the
+        entities of all slots, of shape (n, 2*(# of hops+1)). Entities are drawn by weight for
+        all roles at once, and only rows in which two roles drew the same entity are drawn
+        again.
+        """
+        rng = np.random.default_rng(rng)
+        max_roles = self.n_roles.max()
+        if entity_sampler.n_support < max_roles:
+            raise ValueError(
+                f'Filling {self.n_hops}-hop templates requires at least {max_roles} entities with positive weight'
+            )
+        templates = rng.choice(len(self), size=n, p=self.p)
+        role_entities = entity_sampler.draw((n, max_roles), rng)
+        # Only the roles a template uses have to be distinct
+        is_used = np.arange(max_roles) < self.n_roles[templates, None]
+        while True:
+            entities = np.sort(np.where(is_used, role_entities, -1), axis=1)
+            redraw = ((entities[:, 1:] == entities[:, :-1]) & (entities[:, 1:] >= 0)).any(axis=1)
+            if not redraw.any():
+                break
+            role_entities[redraw] = entity_sampler.draw((redraw.sum(), max_roles), rng)
+        return role_entities[np.arange(n)[:, None], self.roles[templates]]
+
+    def create_patterns(
+        self,
+        entity_sampler: AliasSampler,
+        relation_sampler: AliasSampler,
+        time_lags: 'List[Tuple(int,int)]',
+        n: int,
+        rng: np.random.Generator = None,
+    ) -> 'List[TemporalPattern]':
+        """ Create n patterns from sampled templates. Relations are sampled by weight, with the
+        consequence relation switched to an antecedent relation if it is not one already, as
+        in create_*_hop_patterns. Has the signature of create_*_hop_patterns.
+        """
+        rng = np.random.default_rng(rng)
+        sampled_entities = self.fill(entity_sampler, n, rng)
+        sampled_relations = relation_sampler.draw((n, self.n_hops+1), rng)
+        # Consequence must have a relation in some antecedent
+        force_swap_to_entities_batch(
+            ~isin_rows(sampled_relations[:, -1], sampled_relations[:, :-1]),
+            [self.n_hops], sampled_relations, list(range(self.n_hops)), rng,
+        )
+        return patterns_from_samples(sampled_entities, sampled_relations, time_lags, rng)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_roles(n_hops: int) -> np.ndarray:
+    return PatternTemplates.from_xlsx(
+        os.path.join(TEMPLATE_DIR, f'all_patterns_{n_hops}_hop.xlsx')
+    ).roles
+
+def load_templates(n_hops: int, wts=None) -> PatternTemplates:
+    """ Load the templates of n_hops-hop patterns shipped with the repo. Topology tables are
+    only read once per process.
+    Args:
+        n_hops (int): Number of hops
+        wts: Weights of the templates, or a function taking the role table and returning
+            them, default None for uniform
+    """
+    roles = _load_roles(n_hops)
+    if callable(wts):
+        wts = wts(roles)
+    return PatternTemplates(roles, wts)
@@ -4,21 +4,41 @@ import pandas as pd
 from joblib import Parallel, delayed
 from tqdm import tqdm
 
+import argparse
 import os
-import random
 import shutil
 
+from collections import defaultdict
+
+from aliassampler import AliasSampler
 from config import configs
-from patterns import create_1_hop_pattern, \
-    create_2_hop_pattern, \
-    create_3_hop_pattern
+from edgechunks import EdgeChunks
+from edgestore import EdgeStore
+from manifest import RunManifest, checksum_run
+from matcher import PatternMatcher
+from patternmembership import PatternMembership
+from patterntable import PatternTable
+from patterntemplates import load_templates
+from subpatternregistry import SubpatternRegistry
+from patterns import create_1_hop_patterns, \
+    create_2_hop_patterns, \
+    create_3_hop_patterns
 from temporalpattern import TemporalPattern
-from utils import is_subpattern
+from utils import pack_edge_keys, \
+    unpack_edge_keys
+
 
+def create_rng(config: 'Dict[str,]', run_id: int) -> np.random.Generator:
+    """ Create the random number generator of run_id of config. Every run gets an independent
+    stream, spawned from config['seed'], so runs are reproducible regardless of which worker
+    process executes them.
+    """
+    seed_seq = np.random.SeedSequence(config['seed']).spawn(config['n_runs'])[run_id]
+    return np.random.default_rng(seed_seq)
 
-def create_entity2id(config) -> pd.DataFrame:
+def create_entity2id(config, rng: np.random.Generator = None) -> pd.DataFrame:
     if config['pat_distr_ents']:
-        wts = config['pat_distr_ents'](config['n_ents'])
+        wts = config['pat_distr_ents'](config['n_ents'], np.random.default_rng(rng))
     else:
         wts = [1]*config['n_ents']
     return pd.DataFrame({
@@ -27,9 +47,9 @@ def create_entity2id(config) -> pd.DataFrame:
         'wt': wts,
     })
 
-def create_relation2id(config) -> pd.DataFrame:
+def create_relation2id(config, rng: np.random.Generator = None) -> pd.DataFrame:
     if config['pat_distr_rels']:
-        wts = config['pat_distr_rels'](config['n_rels'])
+        wts = config['pat_distr_rels'](config['n_rels'], np.random.default_rng(rng))
     else:
         wts = [1]*config['n_rels']
     return pd.DataFrame({
@@ -51,280 +71,273 @@ def create_pattern2id(patterns: 'List[TemporalPattern]') -> pd.DataFrame:
         'id': range(len(patterns)),
     })
 
-def create_edgelist() -> pd.DataFrame:
-    return pd.DataFrame({
-        'head': [],
-        'rel': [],
-        'tail': [],
-        't': [],
-        'wt': [],
-        'pattern': [],
+def wire_entities(
+    config: 'Dict[str,]',
+    entity2id: pd.DataFrame,
+    relation2id: pd.DataFrame,
+    t: int,
+    rng: np.random.Generator = None,
+) -> 'Dict[str,np.ndarray]':
+    """ Randomly wire all entities in time window t at once. The density of every entity is
+    drawn for the whole window, then all tails and relations are sampled as arrays and returned
+    as a single columnar block of edges.
+    """
+    rng = np.random.default_rng(rng)
+    ent_ids = entity2id['id'].to_numpy()
+    rel_ids = relation2id['id'].to_numpy()
+    # Sample number of random edges per entity
+    if config['rnd_avg_density_distr']:
+        dens = np.asarray(
+            config['rnd_avg_density_distr'](len(ent_ids), rng), dtype=float).reshape(-1)
+    else:
+        dens = np.full(len(ent_ids), config['rnd_avg_density'], dtype=float)
+    # Handle random density specifications in the range (0,1)
+    # With specified probability, sample one random edge, otherwise no random edge is sampled
+    frac = (dens > 0) & (dens < 1)
+    dens[frac] = rng.random(frac.sum()) < dens[frac]
+    dens = dens.astype(int)
+    # Sample entities to use as tails and relations to connect them
+    heads = np.repeat(ent_ids, dens)
+    tails = rng.choice(ent_ids, len(heads))
+    rels = rng.choice(rel_ids, len(heads))
+    return {
+        'head': heads,
+        'rel': rels,
+        'tail': tails,
+        't': np.full(len(heads), t),
+        'pattern': -1,  # -1 indicates a randomly wired edge
+    }
+
+def aggregate_edges(
+    edgelist: pd.DataFrame,
+    membership: PatternMembership,
+    n_ents: int,
+    n_rels: int,
+) -> 'Tuple[pd.DataFrame,PatternMembership]':
+    """ Aggregate duplicate (head, rel, tail, t) edges by summing their weights and taking the
+    union of their pattern memberships. Edges are packed into int64 keys and sorted once, so
+    the result comes out sorted by t, head, tail and rel.
+    """
+    keys = pack_edge_keys(
+        edgelist['head'].to_numpy(), edgelist['rel'].to_numpy(),
+        edgelist['tail'].to_numpy(), edgelist['t'].to_numpy(),
+        n_ents, n_rels,
+    )
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    # Start of each group of identical keys
+    is_start = np.ones(keys.shape[0], dtype=bool)
+    is_start[1:] = keys[1:] != keys[:-1]
+    starts = np.flatnonzero(is_start)
+    group_idxs = np.empty(keys.shape[0], dtype=np.int64)
+    group_idxs[order] = np.cumsum(is_start)-1
+    wts = edgelist['wt'].to_numpy()[order]
+    heads, rels, tails, ts = unpack_edge_keys(keys[starts], n_ents, n_rels)
+    aggregated = pd.DataFrame({
+        'head': heads,
+        'rel': rels,
+        'tail': tails,
+        't': ts,
+        'wt': np.add.reduceat(wts, starts) if starts.shape[0] > 0 else wts,
     })
+    return aggregated, membership.reduce(group_idxs, starts.shape[0])
+
+def force_antecedents(
+    pattern_table: PatternTable,
+    forced: np.ndarray,
+    t: int,
+    n_tws: int,
+    rng: np.random.Generator = None,
+) -> 'Dict[str,np.ndarray]':
+    """ Create the antecedents of all forced patterns at once, as a single columnar block of
+    edges. The first antecedent of every pattern is created in time window t and every later
+    one follows the previous one by a time lag drawn from the pattern's lag range. Edges that
+    would land in window n_tws or later are dropped.
+    Args:
+        pattern_table (PatternTable): Patterns to force
+        forced (np.ndarray): Boolean mask of the patterns to force
+        t (int): Time window of the first antecedents
+        n_tws (int): Number of time windows
+        rng (np.random.Generator): Random number generator, or seed to create one from,
+            default None
+    """
+    rng = np.random.default_rng(rng)
+    antecedents = pattern_table.antecedents[forced]
+    time_lags = pattern_table.time_lags[forced].clip(min=0)
+    is_hop = np.arange(antecedents.shape[1]) < pattern_table.n_hops[forced, None]
+    steps = rng.integers(time_lags[:, :, 0], time_lags[:, :, 1], endpoint=True)
+    # Antecedent i follows antecedent i-1 by the time lag after i-1
+    ts = t + np.cumsum(steps, axis=1) - steps
+    keep = is_hop & (ts < n_tws)
+    return {
+        'head': antecedents[:, :, 0][keep],
+        'rel': antecedents[:, :, 1][keep],
+        'tail': antecedents[:, :, 2][keep],
+        't': ts[keep],
+    }
 
-def add_new_pattern(
+def finish_chunk(
+    config: 'Dict[str,]',
+    edges: EdgeStore,
+    chunks: EdgeChunks,
+    matcher: PatternMatcher,
+    t_end: int,
+):
+    """ Move the edges of all time windows before t_end from edges to a new chunk of chunks.
+    Duplicate edges are aggregated first, and the chunk is fed to matcher under the ids its edges
+    have across all chunks.
+    """
+    edgelist, membership = edges.pop_before(t_end)
+    # Aggregate duplicate edges, merging their pattern memberships
+    edgelist, membership = aggregate_edges(
+        edgelist, membership, config['n_ents'], config['n_rels'])
+    t_starts = np.flatnonzero(np.diff(edgelist['t'].to_numpy(), prepend=-1))
+    t_ends = np.append(t_starts[1:], edgelist.shape[0])
+    heads, rels, tails = \
+        edgelist['head'].to_numpy(), edgelist['rel'].to_numpy(), edgelist['tail'].to_numpy()
+    offset = chunks.n_edges
+    for start, end in zip(t_starts, t_ends):
+        matcher.ingest(
+            edgelist['t'].iat[start],
+            heads[start:end], rels[start:end], tails[start:end],
+            range(offset+start, offset+end),
+        )
+    chunks.append(edgelist, membership)
+
+def add_new_patterns(
     config: 'Dict[str,]',
     patterns: 'List[TemporalPattern]',
-    pattern_quadruples: 'List[Tuple]',
-    pattern_creation_func,
+    registry: SubpatternRegistry,
+    patterns_creation_func,
+    n: int,
     time_lag,
-    entity2id: pd.DataFrame,
-    relation2id: pd.DataFrame,
+    entity_sampler: AliasSampler,
+    relation_sampler: AliasSampler,
+    rng: np.random.Generator = None,
 ) -> None:
-    """ Add new pattern as long as it is not a subpattern of any existing pattern.
-    Note, adds patterns to patterns and pattern_quadruples in place.
+    """ Add n new patterns, as long as they are not subpatterns of any existing pattern.
+    Candidates are created in batches, and every pattern that is rejected gets a new candidate
+    in the next batch, up to config['max_retries'] candidates per pattern.
+    Note, adds patterns to patterns and registry in place.
     """
-    new_pat = False
-    retry = 0
-    while (not new_pat) | (retry < config['max_retries']):
-        pat = pattern_creation_func(entity2id, relation2id, time_lag)
-        # Find out if quadruple is 
-        quad = pat.__quadruples__()
-        if ~is_subpattern(quad, pattern_quadruples):
-            patterns.append(pat)
-            pattern_quadruples.append(quad)
-            new_pat = True
-        retry += 1
-
-def get_satisfying_idxs(
-    pattern: TemporalPattern, edgelist: pd.DataFrame, prev_t: int = -1,
-    satisfying_idxs: 'List[int]' = [], prev_idxs = [],
-) -> 'List[int]':
-    """ Get ids of triples that satisfy pattern in edgelist
-    """
-    if pattern.n_hops == 0:
-        # Final check for consequence
-        cons = pattern.consequence
-        time_lag = pattern.time_lags[0]
-        triples = edgelist[
-            (edgelist['head'] == cons[0]) &
-            (edgelist['rel'] == cons[1]) &
-            (edgelist['tail'] == cons[2]) &
-            (edgelist['t'] >= prev_t+time_lag[0] if prev_t != -1 else edgelist['t'] > -np.inf) &
-            (edgelist['t'] <= prev_t+time_lag[1] if prev_t != -1 else edgelist['t'] < np.inf)
-        ]
-        if triples.shape[0] > 0:
-            # If some valid consequence is found, return all its satisfying
-            # triples' locations
-            return list(set(satisfying_idxs+prev_idxs+triples.index.tolist()))
-    else:
-        # Otherwise, check first antecedent recursively
-        ante = pattern.antecedent[0]
-        time_lag = pattern.time_lags[0] if prev_t != -1 else None
-        triples = edgelist[
-            (edgelist['head'] == ante[0]) &
-            (edgelist['rel'] == ante[1]) &
-            (edgelist['tail'] == ante[2]) &
-            (edgelist['t'] >= prev_t+time_lag[0] if prev_t != -1 else edgelist['t'] > -np.inf) &
-            (edgelist['t'] <= prev_t+time_lag[1] if prev_t != -1 else edgelist['t'] < np.inf)
-        ]
-        new_idxs = triples.index.tolist()
-        new_satisfying_idxs = []
-        for idx in new_idxs:
-            new_pattern = TemporalPattern(
-                antecedent=list(pattern.antecedent)[1:],
-                consequence=pattern.consequence,
-                time_lags=list(pattern.time_lags)[1:] if prev_t != -1 else list(pattern.time_lags),
-                n_hops=pattern.n_hops-1,
-            )
-            new_satisfying_idxs.extend(get_satisfying_idxs(
-                new_pattern, edgelist,
-                prev_t=edgelist.loc[idx]['t'],
-                satisfying_idxs=satisfying_idxs,
-                prev_idxs=list(set(prev_idxs+[idx])),
-            ))
-        satisfying_idxs.extend(new_satisfying_idxs)
-    return list(set(satisfying_idxs))
+    n_missing = n
+    for _ in range(config['max_retries']):
+        if n_missing == 0:
+            return
+        for pat in patterns_creation_func(
+                entity_sampler, relation_sampler, time_lag, n_missing, rng):
+            # Find out if quadruples are contained in an existing pattern
+            quad = pat.__quadruples__()
+            if quad not in registry:
+                patterns.append(pat)
+                registry.add(quad)
+                n_missing -= 1
 
 def run(config: 'Dict[str,]', run_id: int):
     """ Create TKGs according to configuration from config.py file
     """
+    rng = create_rng(config, run_id)
+
     # Create ids for entities, relations, and time windows
-    entity2id = create_entity2id(config)
-    relation2id = create_relation2id(config)
+    entity2id = create_entity2id(config, rng)
+    relation2id = create_relation2id(config, rng)
     time2id = create_time2id(config)
 
     # Instantiate patterns
     # Start from 3-hop patterns, then 2-hop, then 1-hop
     # Prohibit any new patterns from being contained (antecedent and consequence) in the antecedent of
     # an existing larger pattern or being identical to an already chosen same-sized pattern
+    # Weighted samplers of entity and relation ids, built once for all patterns
+    entity_sampler = AliasSampler.from_frame(entity2id)
+    relation_sampler = AliasSampler.from_frame(relation2id)
     patterns = []
-    pattern_quadruples = []
-    for _ in range(config['n_3_hop']):
-        add_new_pattern(
-            config, patterns, pattern_quadruples, create_3_hop_pattern,
-            config['time_lag_3_hop'], entity2id, relation2id,
-        )
-    for _ in range(config['n_2_hop']):
-        add_new_pattern(
-            config, patterns, pattern_quadruples, create_2_hop_pattern,
-            config['time_lag_2_hop'], entity2id, relation2id,
-        )
-    for _ in range(config['n_1_hop']):
-        add_new_pattern(
-            config, patterns, pattern_quadruples, create_1_hop_pattern,
-            config['time_lag_1_hop'], entity2id, relation2id,
+    registry = SubpatternRegistry()
+    if config['pattern_templates']:
+        creation_funcs = {
+            n_hops: load_templates(n_hops, config['template_wts']).create_patterns
+            for n_hops in [1, 2, 3]
+        }
+    else:
+        creation_funcs = {
+            1: create_1_hop_patterns,
+            2: create_2_hop_patterns,
+            3: create_3_hop_patterns,
+        }
+    for n_hops in [3, 2, 1]:
+        add_new_patterns(
+            config, patterns, registry, creation_funcs[n_hops], config[f'n_{n_hops}_hop'],
+            config[f'time_lag_{n_hops}_hop'], entity_sampler, relation_sampler, rng,
         )
     # Create dataframe of pattern ids
     pattern2id = create_pattern2id(patterns)
+    # Compile patterns once, for reuse when applying and labeling them in every time window
+    pattern_table = PatternTable.from_patterns(patterns)
+    p_force = np.array([config['n_hops2p_force'][n_hops] for n_hops in pattern_table.n_hops])
 
     # Apply patterns
-    edgelist = create_edgelist()
-    pbar_tws = tqdm(range(config['n_tws']))
+    export_dir = os.path.join(config['export_dir'], f'run_{run_id}')
+    edges = EdgeStore()
+    # Online matcher of antecedents, which schedules the consequences of patterns as their
+    # antecedent chains complete. Edges of a time window are fed to it once the window is final,
+    # until then they are collected in window_edges
+    applier = PatternMatcher(pattern_table, fire_consequences=True)
+    window_edges = defaultdict(lambda: ([], [], []))
+    # Edges of finished time windows are aggregated and matched against all patterns in chunks,
+    # which are kept in memory or, if config['chunk_tws'] is set, spilled to disk every
+    # chunk_tws windows
+    chunk_tws = config['chunk_tws']
+    chunks = EdgeChunks(os.path.join(export_dir, 'chunks') if chunk_tws else None)
+    matcher = PatternMatcher(pattern_table)
+    pbar_tws = tqdm(range(config['n_tws']), leave=False)
     for t in pbar_tws:
-        pbar_tws.set_description(f'Time window: {t}')
+        pbar_tws.set_description(f'{export_dir}, time window: {t}')
         # First randomly wire entities
-        pbar_ent = tqdm(entity2id['id'])
-        dfs_i = []
-        for ent_id in pbar_ent:
-            pbar_ent.set_description(f'Entity: {ent_id}')
-            # Sample entities to use as tails
-            if config['rnd_avg_density_distr']:
-                dens = config['rnd_avg_density_distr']()
-            else:
-                dens = config['rnd_avg_density']
-            # Handle random density specifications in the range (0,1)
-            if (dens > 0) and (dens < 1):
-                rnd = random.random()
-                # With specified probability, sample one random edge
-                if rnd < dens:
-                    dens = 1
-                # Otherwise, no random edge is sampled
-                else:
-                    dens = 0
-            else:
-                dens = int(dens)
-            if dens == 0:
-                # No random edge
-                continue
-            tails = entity2id['id'].sample(dens, replace=True)
-            # Sample relations to connect them
-            rels = relation2id['id'].sample(dens, replace=True)
-            df_i = pd.DataFrame({
-                'head': [ent_id]*dens,
-                'rel': rels.values,
-                'tail': tails.values,
-                't': [t]*dens,
-                'wt': [1]*dens,
-                'pattern': [[-1]]*dens,  # -1 indicates a randomly wired edge
-            })
-            dfs_i.append(df_i)
-        edgelist = pd.concat([edgelist]+dfs_i)
-
-        # Iterate over patterns
-        heads, rels, tails, pats = [], [], [], []
-        dfs_pat = []
-        for label, pattern_id in zip(pattern2id['pattern'], pattern2id['id']):
-            # Instantiate pattern from label
-            pattern = TemporalPattern()
-            pattern.from_label(label)
-
-            # Artificially create valid patterns 
-            rnd = random.random()
-            if rnd < config['n_hops2p_force'][pattern.n_hops]:
-                # Create the antecedent in this and subsequent windows
-                # Track time window of current antecedent as we create them
-                t_i = int(t)
-                heads_pat, rels_pat, tails_pat, ts_pat = [], [], [], []
-                for antecedent, time_lag in zip(pattern.antecedent, pattern.time_lags):
-                    heads_pat.append(antecedent[0])
-                    rels_pat.append(antecedent[1])
-                    tails_pat.append(antecedent[2])
-                    ts_pat.append(t_i)
-                    # Increment t_i according to time_lag min and max
-                    t_i += random.randint(time_lag[0], time_lag[1])
-                df_pat = pd.DataFrame({
-                    'head': heads_pat,
-                    'rel': rels_pat,
-                    'tail': tails_pat,
-                    't': ts_pat,
-                    'wt': [1]*len(heads_pat),
-                    'pattern': [[]]*len(heads_pat),
-                })
-                dfs_pat.append(df_pat)
-            
-            # Apply valid patterns
-            rnd = random.random()
-            if rnd < config['p_skip_consequence']:
-                # Skip the consequence even though antecedents may be satisfied
-                continue
-            # Test whether antecedents are satisfied in prior windows
-            antecedents_satisfied = False
-            # Iterate over antecedents in reverse order (most recent to least recent)
-            t_i = [t]  # Track current time window(s) for antecedent validation
-            for antecedent, time_lag in zip(pattern.antecedent[::-1], pattern.time_lags[::-1]):
-                # Check whether the antecedent exists in the edgelist
-                df_ants = [
-                    edgelist[
-                        (edgelist['head'] == antecedent[0]) &
-                        (edgelist['rel'] == antecedent[1]) &
-                        (edgelist['tail'] == antecedent[2]) &
-                        (edgelist['t'] <= t_-time_lag[0]) & 
-                        (edgelist['t'] >= t_-time_lag[1])
-                    ] for t_ in t_i
-                ]
-                df_ants = [df for df in df_ants if df.shape[0] > 0]
-                if len(df_ants) == 0:
-                    # No satisfied antecedent
-                    antecedents_satisfied = False
-                    continue
-                t_i = pd.concat(df_ants)['t'].unique().tolist()
-                antecedents_satisfied = True
-            # If all antecedents are satisfied, create consequence in current time window
-            if antecedents_satisfied:
-                heads.append(pattern.consequence[0])
-                rels.append(pattern.consequence[1])
-                tails.append(pattern.consequence[2])
-                pats.append([pattern_id])
-        # Add new forced patterns to edgelist
-        edgelist = pd.concat([edgelist]+dfs_pat)
-        # Add all new consequences to edgelist
-        df_con = pd.DataFrame({
-            'head': heads,
-            'rel': rels,
-            'tail': tails,
-            't': [t]*len(heads),
-            'wt': [1]*len(heads),
-            'pattern': [[]]*len(heads),
-            # Labeling them now is okay, but because the artificial creation is
-            # forward-looking, some patterns may extend beyond our range of time
-            # windows, making them invalid in the span of time windows we care
-            # about. Instead, we label all edges for patterns later.
-            # 'pattern': pats,
-        })
-        edgelist = pd.concat([
-            edgelist,
-            df_con,
-        ])
+        wired = wire_entities(config, entity2id, relation2id, t, rng)
+        edges.append(**wired)
+        for col, values in zip(window_edges[t], [wired['head'], wired['rel'], wired['tail']]):
+            col.extend(values.tolist())
 
-    # Cut off edgelist at n_tws (because forced patterns may have extended past n_tws)
-    edgelist = edgelist[edgelist['t'] < config['n_tws']]
-    # Aggregate duplicate edges
-    edgelist = edgelist.groupby(['head', 'rel', 'tail', 't']).agg({
-        'wt': 'sum',
-        'pattern': lambda x: sorted(list(set([el for ids in x for el in ids]))),
-    }).reset_index().sort_values(['t', 'head', 'tail', 'rel']).reset_index(drop=True)
-    
-    # Post-creation, label all valid patterns
-    for label, pattern_id in zip(pattern2id['pattern'], pattern2id['id']):
-        # Instantiate pattern from label
-        pattern = TemporalPattern()
-        pattern.from_label(label)
+        # Artificially create valid patterns, by creating the antecedents of randomly chosen
+        # patterns in this and subsequent windows
+        forced = rng.random(len(pattern_table)) < p_force
+        skipped = rng.random(len(pattern_table)) < config['p_skip_consequence']
+        forced_edges = force_antecedents(pattern_table, forced, t, config['n_tws'], rng)
+        edges.append(**forced_edges)
+        for head, rel, tail, t_i in zip(*[forced_edges[col].tolist() for col in forced_edges]):
+            for col, value in zip(window_edges[t_i], [head, rel, tail]):
+                col.append(value)
+        # Apply valid patterns, i.e. those whose antecedents are satisfied in prior windows,
+        # unless their consequence is skipped
+        fired = [pattern_id for pattern_id in applier.fire(t) if not skipped[pattern_id]]
+        # Create consequences in current time window
+        heads, rels, tails = pattern_table.consequences[fired].T.reshape(3, -1).tolist()
+        # Add all new consequences to edgelist, unlabeled. Because the artificial creation is
+        # forward-looking, some patterns may extend beyond our range of time windows, making
+        # them invalid in the span of time windows we care about. Instead, we label all edges
+        # for patterns later.
+        edges.append(heads, rels, tails, [t]*len(heads))
+        for col, values in zip(window_edges[t], [heads, rels, tails]):
+            col.extend(values)
+        # Edges are only ever added to the current and later windows, so window t is final
+        applier.ingest(t, *window_edges.pop(t))
+        if chunk_tws and ((t+1) % chunk_tws == 0):
+            # Windows up to t are final
+            finish_chunk(config, edges, chunks, matcher, t+1)
 
-        satisfying_idxs = get_satisfying_idxs(
-            pattern, edgelist, prev_t=-1, satisfying_idxs=[],
-        )
-        for idx in satisfying_idxs:
-            edgelist.loc[idx]['pattern'].append(pattern_id)
+    # Finish the last chunk
+    finish_chunk(config, edges, chunks, matcher, config['n_tws'])
 
-    # Deduplicate patterns
-    edgelist.loc[:,'pattern'] = edgelist['pattern'].apply(lambda x: sorted(list(set(x))))
-    edgelist['head'] = edgelist['head'].astype(int)
-    edgelist['rel'] = edgelist['rel'].astype(int)
-    edgelist['tail'] = edgelist['tail'].astype(int)
-    edgelist['t'] = edgelist['t'].astype(int)
+    # Post-creation, label all valid patterns. The matcher has swept over all time windows, so
+    # occurrences can be pruned back to the edges that take part in a complete one
+    satisfying_idxs = matcher.satisfying_idxs()
+    satisfying_edges = np.array(
+        [idx for idxs in satisfying_idxs for idx in idxs], dtype=np.int64)
+    satisfying_pats = np.repeat(
+        pattern2id['id'].to_numpy(), [len(idxs) for idxs in satisfying_idxs])
+    order = np.argsort(satisfying_edges, kind='stable')
+    satisfying_edges, satisfying_pats = satisfying_edges[order], satisfying_pats[order]
     
     # Export relevant files
-    export_dir = os.path.join(config['export_dir'], f'run_{run_id}')
     os.makedirs(export_dir, exist_ok=True)
     entity2id.to_csv(
         os.path.join(export_dir, 'entity2id.txt'), sep='\t', index=False, header=False)
@@ -338,7 +351,7 @@ def run(config: 'Dict[str,]', run_id: int):
         f.writelines(f'{entity2id.id.nunique()}\t{relation2id.id.nunique()}\t0')
     
     # Temporal Train-Valid-Test split
-    timestamps_unq = pd.Series(edgelist['t'].unique())
+    timestamps_unq = pd.Series(chunks.timestamps())
     end_train, end_valid, end_test = \
         int(timestamps_unq.quantile(config['split'][0])), \
         int(timestamps_unq.quantile(config['split'][0] + config['split'][1])), \
@@ -349,9 +362,6 @@ def run(config: 'Dict[str,]', run_id: int):
     if (end_valid == end_test) and (config['split'][2] != 0):
         # Allow user to specify 0% test set
         raise ValueError(f'Split into valid and test sets failed because of quantile collision: {end_valid}')
-    train_df = edgelist[edgelist['t'] <= end_train]
-    valid_df = edgelist[(edgelist['t'] > end_train) & (edgelist['t'] <= end_valid)]
-    test_df = edgelist[edgelist['t'] > end_valid]
     cols_export = [
         'head', 
         'rel',
@@ -360,25 +370,97 @@ def run(config: 'Dict[str,]', run_id: int):
         'wt',
         'pattern',
     ]
-    train_df[cols_export].to_csv(
-        os.path.join(export_dir, 'train.txt'), sep='\t', index=False, header=False)
-    valid_df[cols_export].to_csv(
-        os.path.join(export_dir, 'valid.txt'), sep='\t', index=False, header=False)
-    test_df[cols_export].to_csv(
-        os.path.join(export_dir, 'test.txt'), sep='\t', index=False, header=False)
+    with open(os.path.join(export_dir, 'train.txt'), 'w') as f_train, \
+            open(os.path.join(export_dir, 'valid.txt'), 'w') as f_valid, \
+            open(os.path.join(export_dir, 'test.txt'), 'w') as f_test:
+        # Label and export one chunk at a time
+        for idx, (edgelist, membership) in enumerate(chunks):
+            offset, n_edges = chunks.offsets[idx], edgelist.shape[0]
+            start, end = np.searchsorted(satisfying_edges, [offset, offset+n_edges])
+            membership = membership.union(PatternMembership.from_pairs(
+                n_edges, satisfying_edges[start:end]-offset, satisfying_pats[start:end],
+            ))
+            # Serialize pattern memberships for export
+            edgelist['pattern'] = membership.to_labels()
+            edgelist['head'] = edgelist['head'].astype(int)
+            edgelist['rel'] = edgelist['rel'].astype(int)
+            edgelist['tail'] = edgelist['tail'].astype(int)
+            edgelist['t'] = edgelist['t'].astype(int)
+            train_df = edgelist[edgelist['t'] <= end_train]
+            valid_df = edgelist[(edgelist['t'] > end_train) & (edgelist['t'] <= end_valid)]
+            test_df = edgelist[edgelist['t'] > end_valid]
+            train_df[cols_export].to_csv(f_train, sep='\t', index=False, header=False)
+            valid_df[cols_export].to_csv(f_valid, sep='\t', index=False, header=False)
+            test_df[cols_export].to_csv(f_test, sep='\t', index=False, header=False)
+    chunks.clear()
     
     # Copy config to export directory, for reproducibility
     shutil.copy2('config.py', export_dir)
 
+    return export_dir
 
-if __name__ == "__main__":
-    # Iterate over configuration files
-    # Note: This could also be parallelized or otherwise done in a better way
+
+def estimate_run_cost(config: 'Dict[str,]') -> float:
+    """ Estimate the relative cost of a single run of config, for scheduling. Generation
+    scales with the number of randomly wired edges and patterns per time window, where
+    patterns with more hops cost more to apply and label.
+    """
+    n_patterns = config['n_1_hop'] + 2*config['n_2_hop'] + 3*config['n_3_hop']
+    return config['n_tws']*(config['n_ents'] + n_patterns)
+
+def run_job(config: 'Dict[str,]', run_id: int) -> 'Tuple[str,int,Dict[str,str]]':
+    """ Run a single job and checksum its outputs, for the manifest of its export directory
+    """
+    export_dir = run(config, run_id)
+    return config['export_dir'], run_id, checksum_run(export_dir)
+
+def run_all(configs: 'List[Dict[str,]]', n_jobs: int = None, force: bool = False):
+    """ Run all configs from a single queue of (config, run_id) jobs, so that workers are not
+    held up by the slowest run of each config. Jobs are dispatched longest first. Runs that a
+    previous sweep completed, with the same config and unchanged outputs, are skipped.
+    Args:
+        configs (List[Dict[str,]]): Configurations to run, as in config.py
+        n_jobs (int): Number of worker processes, defaults to the number of CPUs
+        force (bool): Whether to also rerun complete runs, default False
+    """
+    manifests = {config['export_dir']: RunManifest(config['export_dir']) for config in configs}
+    jobs = []
     for config in configs:
-        n_runs = config['n_runs']
-        n_jobs = config['n_jobs']
-        n_jobs = min(n_jobs, n_runs)  # Can't have more jobs than runs
+        manifest = manifests[config['export_dir']]
+        for run_id in range(config['n_runs']):
+            if (not force) and manifest.is_complete(run_id, config):
+                continue
+            manifest.start(run_id, config, seed=config['seed'])
+            jobs.append((config, run_id))
+    for manifest in manifests.values():
+        manifest.save()
+    if len(jobs) == 0:
+        return
+    jobs.sort(key=lambda job: estimate_run_cost(job[0]), reverse=True)
+    n_jobs = min(n_jobs or os.cpu_count(), len(jobs))  # Can't have more jobs than runs
 
-        Parallel(n_jobs=n_jobs)(
-            delayed(run)(config, run_id) for run_id in range(n_runs)
-        )
+    pbar_runs = tqdm(
+        Parallel(n_jobs=n_jobs, return_as='generator_unordered')(
+            delayed(run_job)(config, run_id) for config, run_id in jobs
+        ),
+        total=len(jobs),
+    )
+    for export_dir, run_id, checksums in pbar_runs:
+        pbar_runs.set_description(f'Finished {export_dir}/run_{run_id}')
+        manifests[export_dir].complete(run_id, checksums)
+        manifests[export_dir].save()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Create synthetic TKGs for all configs')
+    parser.add_argument(
+        '--n_jobs', type=int, default=None,
+        help='Number of worker processes shared by all runs, defaults to the number of CPUs',
+    )
+    parser.add_argument(
+        '--force', action='store_true',
+        help='Rerun runs that are already complete according to their manifest',
+    )
+    args = parser.parse_args()
+
+    run_all(configs, n_jobs=args.n_jobs, force=args.force)
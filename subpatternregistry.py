@@ -0,0 +1,31 @@
+class SubpatternRegistry():
+    def __init__(self):
+        """ Registry of the contiguous sub-sequences of the quadruple chains of accepted
+        patterns, so testing whether a candidate is a subpattern of any accepted pattern is a
+        single set lookup, O(# of hops), instead of a scan over all accepted patterns. A
+        sub-sequence starting after the first quadruple of its chain is registered without
+        the time lag of its first quadruple, since a candidate's first antecedent has none.
+        """
+        self.subsequences = set()
+
+    def __len__(self) -> int:
+        return len(self.subsequences)
+
+    def __contains__(self, quadruples: 'List[Tuple]') -> bool:
+        """ Test whether quadruples is a contiguous sub-sequence of an accepted chain
+        """
+        return self.key(quadruples) in self.subsequences
+
+    @staticmethod
+    def key(quadruples: 'List[Tuple]') -> tuple:
+        """ Key of a chain of quadruples, with the time lag of its first quadruple dropped
+        """
+        return (tuple(quadruples[0][:3]),) + tuple(tuple(quad) for quad in quadruples[1:])
+
+    def add(self, quadruples: 'List[Tuple]'):
+        """ Register all contiguous sub-sequences of an accepted chain of quadruples
+        """
+        # Every pattern holds at least an antecedent and a consequence
+        for start in range(len(quadruples)-1):
+            for stop in range(start+2, len(quadruples)+1):
+                self.subsequences.add(self.key(quadruples[start:stop]))
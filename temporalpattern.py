@@ -1,35 +1,123 @@
+import numpy as np
+import pandas as pd
+
 import re
 
 
+# Regex patterns used to parametrize a pattern from a text label, as generated by __label__
+# The first (subject, relation, object, time) segment, which has no time lag, and every later
+# one, which has a time lag from the previous one
+FIRST_SEGMENT = r'\(\d+,\s\d+,\s\d+,\st1\)'
+NEXT_SEGMENT = r'\(\d+,\s\d+,\s\d+,\st\d+=t\d+\+\(\d+,\s\d+\)\)'
+PAT_LABEL = re.compile(rf'{FIRST_SEGMENT}(?:\s&\s{NEXT_SEGMENT})*\s->\s{NEXT_SEGMENT}')
+# Non-negative integers in a pattern label
+PAT_INTEGER = re.compile(r'\d+')
+
+
+def parse_labels(labels: 'List[str]') -> 'Tuple[np.ndarray,np.ndarray,np.ndarray]':
+    """ Validate pattern labels and extract their integers, shared by TemporalPattern.from_label
+    and PatternTable.from_labels. Labels are matched against the label grammar and the time
+    indices of their segments are checked, so malformed labels raise a ValueError and no part
+    of a label is ever evaluated. An n-hop label holds 4+7n integers: (h, r, t, 1) for the
+    first antecedent and (h, r, t, i+1, i, lag_min, lag_max) for every following antecedent and
+    the consequence. Returns the number of hops of every label, the offset of its first
+    integer, and the integers of all labels.
+    """
+    is_valid = pd.Series(labels, dtype=object).str.strip().str.fullmatch(PAT_LABEL.pattern)
+    if not is_valid.all():
+        raise ValueError(f'Malformed pattern label: {labels[int(np.argmin(is_valid))]}')
+    n_hops = np.array([label.count('&')+1 for label in labels], dtype=np.int64)
+    n_ints = 4 + 7*n_hops
+    ints = np.array(PAT_INTEGER.findall('\n'.join(labels)), dtype=np.int64)
+    offsets = np.cumsum(n_ints) - n_ints
+    # Segment 1, ..., n of every label must read t{seg+1}=t{seg}
+    label_idxs = np.repeat(np.arange(len(labels)), n_hops)
+    segs = np.arange(label_idxs.shape[0]) - np.repeat(np.cumsum(n_hops)-n_hops, n_hops) + 1
+    starts = offsets[label_idxs] + 4 + 7*(segs-1)
+    is_valid = (ints[starts+3] == segs+1) & (ints[starts+4] == segs)
+    if not is_valid.all():
+        raise ValueError(f'Malformed pattern label: {labels[label_idxs[np.argmin(is_valid)]]}')
+    return n_hops, offsets, ints
+
+
 class TemporalPattern():
+    __slots__ = ('antecedent', 'consequence', 'time_lags', 'n_hops')
+
     def __init__(
         self,
-        antecedent: 'List[Tuple[int,int,int]]' = [],
+        antecedent: 'Iterable[Tuple[int,int,int]]' = (),
         consequence: 'Tuple[int,int,int]' = None,
-        time_lags: 'List[Tuple[float,float]]' = [],
+        time_lags: 'Iterable[Tuple[int,int]]' = (),
         n_hops: int = None,
     ):
-        """ Defines a temporal pattern over our TKG
+        """ Defines an immutable temporal pattern over our TKG. Patterns compare and hash by
+        their structure, so they can be used in sets and as dict keys.
         Args:
-            antecedent (List[Tuple[int,int,int]]): Antecedent(s) for the pattern
+            antecedent (Iterable[Tuple[int,int,int]]): Antecedent(s) for the pattern
                 in the form of subject, relation, object ID triples
             consequence (Tuple[int,int,int]): Consequence for the pattern in the form
                 of a subject, relation, object ID triple
-            time_lags (List[Tuple[float,float]]): Time lags with which antecedents and 
+            time_lags (Iterable[Tuple[int,int]]): Time lags with which antecedents and
                 consequences can occur validly in the pattern. Must be an iterable of
                 length equal to the antecedent. The i-th element of time_lags is a
                 tuple of the form (minimum # of time windows since i-th antecedent,
                 maximum # of time windows since i-th antecedent) for the i+1-th
                 antecedent (or consequence if we have iterated over all antecedents)
         """
-        self.antecedent = antecedent
-        self.consequence = consequence
-        self.time_lags = time_lags
-        self.n_hops = n_hops
-
-        # Regex pattern used to parametrize a pattern from a text label
-        self.pat_time_lag = re.compile('t\d+=t\d+\+\((\d+),\s(\d+)\)')
-    
+        object.__setattr__(
+            self, 'antecedent', tuple(tuple(map(int, triple)) for triple in antecedent))
+        object.__setattr__(
+            self, 'consequence', None if consequence is None else tuple(map(int, consequence)))
+        time_lags = tuple(tuple(time_lag) for time_lag in time_lags)
+        if any(int(bound) != bound for time_lag in time_lags for bound in time_lag):
+            raise ValueError(f'Time lags must be integers: {time_lags}')
+        object.__setattr__(
+            self, 'time_lags', tuple(tuple(map(int, time_lag)) for time_lag in time_lags))
+        object.__setattr__(self, 'n_hops', n_hops)
+
+    @classmethod
+    def _from_parts(
+        cls,
+        antecedent: 'Tuple[Tuple[int,int,int]]',
+        consequence: 'Tuple[int,int,int]',
+        time_lags: 'Tuple[Tuple[int,int]]',
+        n_hops: int,
+    ) -> 'TemporalPattern':
+        """ Create a pattern from already normalized tuples, skipping conversion
+        """
+        pattern = cls.__new__(cls)
+        object.__setattr__(pattern, 'antecedent', antecedent)
+        object.__setattr__(pattern, 'consequence', consequence)
+        object.__setattr__(pattern, 'time_lags', time_lags)
+        object.__setattr__(pattern, 'n_hops', n_hops)
+        return pattern
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __reduce__(self) -> tuple:
+        # Slots cannot be restored through __setattr__, so pickle and copy rebuild patterns from
+        # their parts
+        return (TemporalPattern._from_parts, self.__key__())
+
+    def __key__(self) -> tuple:
+        return (self.antecedent, self.consequence, self.time_lags, self.n_hops)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TemporalPattern):
+            return NotImplemented
+        return self.__key__() == other.__key__()
+
+    def __hash__(self) -> int:
+        return hash(self.__key__())
+
+    def __repr__(self) -> str:
+        if (self.consequence is None) or (len(self.antecedent) == 0) or \
+                (len(self.time_lags) != len(self.antecedent)):
+            # Incomplete pattern, which has no label
+            return f'TemporalPattern{self.__key__()!r}'
+        return f'TemporalPattern({self.__label__()})'
+
     def __label__(self) -> str:
         """ Return a string label for the pattern like <ANTECEDENT> -> <CONSEQUENCE>
         """
@@ -47,41 +135,41 @@ class TemporalPattern():
         label += f'{self.consequence[2]}, '
         label += f't{len(self.antecedent)+1}{f"=t{len(self.antecedent)}+"+str(self.time_lags[-1])})'
         return label
-    
+
     def __triples__(self) -> 'List[Tuple[int,int,int]]':
         """ Return antecedent and consequence as list of triples (excluding time lag information)
         """
-        return self.antecedent + [self.consequence]
-    
-    def __quadruples__(self) -> 'List[Tuple[int,int,int,Tuple[float,float]]]':
+        return list(self.antecedent) + [self.consequence]
+
+    def __quadruples__(self) -> 'List[Tuple[int,int,int,Tuple[int,int]]]':
         """ Return antecedent and consequence as list of quadruples (including time lag information)
         """
         return [
-            triple + (time_lag,) for triple, time_lag in zip(self.__triples__(), [()]+self.time_lags)
+            triple + (time_lag,) for triple, time_lag in zip(self.__triples__(), ((),)+self.time_lags)
         ]
-    
-    def from_label(self, label: str):
-        """ Parametrize a pattern from a string label (as generated by __label__ method)
+
+    def suffix(self, n: int = 1) -> 'TemporalPattern':
+        """ Return the pattern without its first n antecedents (and the time lags following
+        them). The remaining triples and time lags are shared with this pattern, not copied.
+        At least one antecedent has to remain.
         """
-        antecedent, consequence = label.split('->')
-        antecedent = antecedent.split('&')
-        # Get time lag information
-        time_lags = [
-            (
-                int(self.pat_time_lag.search(text).groups()[0]),
-                int(self.pat_time_lag.search(text).groups()[1])
-            )
-            for text in antecedent+[consequence]
-            if self.pat_time_lag.search(text)
-        ]
-        # Format antecedent and consequence
-        antecedent = [
-            eval('('+','.join(ant.strip(' ()').split(',')[:3])+')')
-            for ant in antecedent
-        ]
-        consequence = eval('('+','.join(consequence.strip(' ()').split(',')[:3])+')')
-        
-        self.antecedent = antecedent
-        self.consequence = consequence
-        self.time_lags = time_lags
-        self.n_hops = len(antecedent)
+        if not (0 <= n < self.n_hops):
+            raise ValueError(f'Cannot drop {n} antecedents of a {self.n_hops}-hop pattern')
+        return TemporalPattern._from_parts(
+            self.antecedent[n:], self.consequence, self.time_lags[n:], self.n_hops-n,
+        )
+
+    @classmethod
+    def from_label(cls, label: str) -> 'TemporalPattern':
+        """ Parametrize a pattern from a string label (as generated by __label__ method).
+        Malformed labels raise a ValueError, see parse_labels.
+        """
+        (n_hops,), _, ints = parse_labels([label])
+        ints = ints.tolist()
+        segments = [ints[:3]] + [ints[start:start+7] for start in range(4, len(ints), 7)]
+        return cls._from_parts(
+            antecedent=tuple(tuple(segment[:3]) for segment in segments[:-1]),
+            consequence=tuple(segments[-1][:3]),
+            time_lags=tuple(tuple(segment[5:]) for segment in segments[1:]),
+            n_hops=int(n_hops),
+        )
@@ -0,0 +1,71 @@
+import numpy as np
+
+
+class TripleSet():
+    def __init__(self, n_ents: int, n_rels: int):
+        """ Compact set of (head, rel, tail) triples, held as a sorted array of packed int64 keys.
+        Membership of a whole block of edges is tested with a single binary search, so it can
+        be used to discard edges and patterns that cannot match before any per-edge work.
+        Triples are buffered on add and merged into the sorted keys when the set is queried.
+        Args:
+            n_ents (int): Number of entities, ids at or above it are never members
+            n_rels (int): Number of relations, ids at or above it are never members
+        """
+        if n_ents*n_ents*n_rels > np.iinfo(np.int64).max:
+            raise ValueError(f'Cannot pack triples of {n_ents} entities and {n_rels} relations into int64 keys')
+        self.n_ents = n_ents
+        self.n_rels = n_rels
+        self.keys = np.empty(0, dtype=np.int64)
+        self.pending = []
+
+    def __len__(self) -> int:
+        self._merge()
+        return self.keys.shape[0]
+
+    def __contains__(self, triple: 'Tuple[int,int,int]') -> bool:
+        return bool(self.contains(*([val] for val in triple))[0])
+
+    def _pack(
+        self, heads: np.ndarray, rels: np.ndarray, tails: np.ndarray,
+    ) -> 'Tuple[np.ndarray,np.ndarray]':
+        """ Return packed keys of triples, along with a mask of those with ids in range
+        """
+        heads = np.asarray(heads, dtype=np.int64)
+        rels = np.asarray(rels, dtype=np.int64)
+        tails = np.asarray(tails, dtype=np.int64)
+        in_range = (heads >= 0) & (heads < self.n_ents) & (tails >= 0) & (tails < self.n_ents) \
+            & (rels >= 0) & (rels < self.n_rels)
+        return (heads*self.n_ents + tails)*self.n_rels + rels, in_range
+
+    def _merge(self):
+        """ Merge buffered keys into the sorted keys
+        """
+        if self.pending:
+            self.keys = np.union1d(self.keys, np.concatenate(self.pending))
+            self.pending = []
+
+    def add(self, heads: 'Iterable[int]', rels: 'Iterable[int]', tails: 'Iterable[int]'):
+        """ Add a block of triples. Triples with ids out of range are ignored.
+        """
+        keys, in_range = self._pack(heads, rels, tails)
+        self.pending.append(keys[in_range])
+
+    def find(
+        self, heads: 'Iterable[int]', rels: 'Iterable[int]', tails: 'Iterable[int]',
+    ) -> np.ndarray:
+        """ Return the rank of each triple among the triples of the set, or -1 for triples that
+        are not in it. Ranks stay fixed as long as no triples are added.
+        """
+        self._merge()
+        keys, in_range = self._pack(heads, rels, tails)
+        if self.keys.shape[0] == 0:
+            return np.full(keys.shape[0], -1, dtype=np.int64)
+        pos = np.searchsorted(self.keys, keys).clip(max=self.keys.shape[0]-1)
+        return np.where(in_range & (self.keys[pos] == keys), pos, -1)
+
+    def contains(
+        self, heads: 'Iterable[int]', rels: 'Iterable[int]', tails: 'Iterable[int]',
+    ) -> np.ndarray:
+        """ Return a boolean mask of the triples that are in the set
+        """
+        return self.find(heads, rels, tails) >= 0
@@ -1,50 +1,43 @@
-from itertools import combinations, product
+import numpy as np
 
-import random
+from itertools import combinations
 
 
-def is_subpattern(subpattern: 'List[Tuple]', patterns: 'List[Tuple]') -> bool:
-    """ Test whether subpattern is a subpattern of any member of patterns
+def any_in_range(
+    sorted_values: np.ndarray, lower: np.ndarray, upper: np.ndarray
+) -> np.ndarray:
+    """ Indicate, for each pair of bounds, whether sorted_values contains a value in
+    [lower, upper]
     """
-    n = len(subpattern)
-    pattern_subsets = set([
-        tuple(pattern[idx:idx+n]) for pattern in patterns
-        for idx in range(len(pattern)-n+1)
-    ])
-    if tuple(subpattern) in pattern_subsets:
-        return True
-    return False
+    return np.searchsorted(sorted_values, lower, side='left') < \
+        np.searchsorted(sorted_values, upper, side='right')
 
-def entities_intersect(entities1: 'List[int]', entities2: 'List[int]') -> bool:
-    """ Indicate whether entities1 and entities2 have any intersection
+def pack_edge_keys(
+    heads: np.ndarray,
+    rels: np.ndarray,
+    tails: np.ndarray,
+    ts: np.ndarray,
+    n_ents: int,
+    n_rels: int,
+) -> np.ndarray:
+    """ Pack (head, rel, tail, t) quadruples into single int64 keys, which sort in the order of
+    t, head, tail, rel
     """
-    if len(set(entities1).intersection(entities2)) > 0:
-        return True
-    return False
+    n_tws = int(np.max(ts, initial=0))+1
+    if n_tws*n_ents*n_ents*n_rels > np.iinfo(np.int64).max:
+        raise ValueError(f'Cannot pack edges of {n_ents} entities, {n_rels} relations and {n_tws} time windows into int64 keys')
+    ts = np.asarray(ts, dtype=np.int64)
+    return ((ts*n_ents + heads)*n_ents + tails)*n_rels + rels
 
-def entities_connect_triples(
-    e1: int, e2: int, triple1: 'Tuple[int,int,int]', triple2: 'Tuple[int,int,int]'
-) -> bool:
-    """ Indicate whether entities e1 and e2 connect triples triple1 and triple2
+def unpack_edge_keys(
+    keys: np.ndarray, n_ents: int, n_rels: int
+) -> 'Tuple[np.ndarray,np.ndarray,np.ndarray,np.ndarray]':
+    """ Unpack keys created by pack_edge_keys into heads, rels, tails and ts
     """
-    if (e1 in {triple1[0], triple1[2]}) & (e2 in {triple2[0], triple2[2]}):
-        return True
-    elif (e2 in {triple1[0], triple1[2]}) & (e1 in {triple2[0], triple2[2]}):
-        return True
-    return False
-
-def entities_connect_components(
-    e1: int,
-    e2: int,
-    comp1: 'List[Tuple[int,int,int]]',
-    comp2: 'List[Tuple[int,int,int]]'
-) -> bool:
-    """ Indicate whether entities e1 and e2 connect components comp1 and comp2
-    """
-    for triple1, triple2 in product(comp1, comp2):
-        if entities_connect_triples(e1, e2, triple1, triple2):
-            return True
-    return False
+    keys, rels = np.divmod(keys, n_rels)
+    keys, tails = np.divmod(keys, n_ents)
+    ts, heads = np.divmod(keys, n_ents)
+    return heads, rels, tails, ts
 
 def combinations_of_increasing_size(iterable, a, b):
     """ Return combinations of iterable of size from a to b, inclusive
@@ -55,78 +48,112 @@ def combinations_of_increasing_size(iterable, a, b):
         for comb in combs:
             yield comb
 
-def force_swap_to_entities(
+def isin_rows(values: np.ndarray, pool: np.ndarray) -> np.ndarray:
+    """ Indicate, for each row, whether values (of shape (K,)) is in pool (of shape (K, n))
+    """
+    return (values[:, None] == pool).any(axis=1)
+
+def entities_intersect_rows(entities1: np.ndarray, entities2: np.ndarray) -> np.ndarray:
+    """ Indicate, for each row, whether entities1 and entities2 have any intersection
+    """
+    return (entities1[:, :, None] == entities2[:, None, :]).any(axis=(1, 2))
+
+def force_swap_to_entities_batch(
+    rows: np.ndarray,
     idxs_to_force: 'List[int]',
-    sampled_entities: 'List[int]',
-    swap_to_entities: 'List[int]',
-    seed: int = None,
+    sampled_entities: np.ndarray,
+    swap_to_idxs: 'List[int]',
+    rng: np.random.Generator = None,
 ) -> None:
-    """ Force at least one of idxs_to_swap to be switching in sampled_entities
-    to one of swap_to_entities. Note, alters swap_to_entities in place.
+    """ Force at least one of columns idxs_to_force to switch to an entity of columns
+    swap_to_idxs, in each of rows of a sample matrix: a random non-empty combination of
+    idxs_to_force is switched to entities drawn from swap_to_idxs of the same row. Note, alters
+    sampled_entities in place.
     """
-    random.seed(seed)
-    to_swap = random.choice(
-        list(combinations_of_increasing_size(idxs_to_force, 1, len(idxs_to_force)))
-    )
-    for idx in to_swap:
-        swap_to = random.choice(swap_to_entities)
-        sampled_entities[idx] = swap_to
+    rng = np.random.default_rng(rng)
+    rows = np.flatnonzero(rows)
+    combs = list(combinations_of_increasing_size(idxs_to_force, 1, len(idxs_to_force)))
+    comb_masks = np.array([[idx in comb for idx in idxs_to_force] for comb in combs])
+    to_swap = comb_masks[rng.integers(len(combs), size=rows.shape[0])]
+    swap_to = np.asarray(swap_to_idxs)[
+        rng.integers(len(swap_to_idxs), size=(rows.shape[0], len(idxs_to_force)))]
+    swap_to = sampled_entities[rows[:, None], swap_to]
+    for col, idx in enumerate(idxs_to_force):
+        sampled_entities[rows[to_swap[:, col]], idx] = swap_to[to_swap[:, col], col]
 
-def force_connect_components(
+def force_connect_components_batch(
+    rows: np.ndarray,
     idxs_to_force: 'List[int,int]',
-    sampled_entities: 'List[int]',
-    comp1: 'List[int]',
-    comp2: 'List[int]',
-    seed: int = None,
+    sampled_entities: np.ndarray,
+    comp1_idxs: 'List[int]',
+    comp2_idxs: 'List[int]',
+    rng: np.random.Generator = None,
 ) -> None:
-    """ Force at least one of idxs_to_force to be switched so as to connect comp1
-    and comp2. Note, alters sampled_entities in place.
+    """ Force at least one of the two columns idxs_to_force to be switched so as to connect the
+    components given by columns comp1_idxs and comp2_idxs, in each of rows of a sample matrix.
+    If one of the entities is already in a component, the other is switched to the other
+    component, otherwise both are switched, to the two components in random order. Note,
+    alters sampled_entities in place.
     """
     if len(idxs_to_force) != 2:
         raise ValueError(
-            'force_connecte_components only implemented for idxs_to_force of length 2'
+            'force_connect_components_batch only implemented for idxs_to_force of length 2'
         )
-    random.seed(seed)
-    comps = [comp1, comp2]
-    if sampled_entities[idxs_to_force[0]] in comps[0]:
-        sampled_entities[idxs_to_force[1]] = random.choice(comps[1])
-    elif sampled_entities[idxs_to_force[0]] in comps[1]:
-        sampled_entities[idxs_to_force[1]] = random.choice(comps[0])
-    elif sampled_entities[idxs_to_force[1]] in comps[0]:
-        sampled_entities[idxs_to_force[0]] = random.choice(comps[1])
-    elif sampled_entities[idxs_to_force[1]] in comps[1]:
-        sampled_entities[idxs_to_force[0]] = random.choice(comps[0])
-    else:
-        random.shuffle(comps)
-        sampled_entities[idxs_to_force[0]] = random.choice(comps[0])
-        sampled_entities[idxs_to_force[1]] = random.choice(comps[1])
+    rng = np.random.default_rng(rng)
+    rows = np.flatnonzero(rows)
+    comps = [sampled_entities[rows][:, comp1_idxs], sampled_entities[rows][:, comp2_idxs]]
+    choices = [
+        comp[np.arange(rows.shape[0]), rng.integers(comp.shape[1], size=rows.shape[0])]
+        for comp in comps
+    ]
+    first = sampled_entities[rows, idxs_to_force[0]]
+    second = sampled_entities[rows, idxs_to_force[1]]
+    in_comps = [(isin_rows(first, comp), isin_rows(second, comp)) for comp in comps]
+    # Cases in the order they are checked: first entity in a component, then second
+    first_in_1 = in_comps[0][0]
+    first_in_2 = ~first_in_1 & in_comps[1][0]
+    second_in_1 = ~first_in_1 & ~first_in_2 & in_comps[0][1]
+    second_in_2 = ~first_in_1 & ~first_in_2 & ~second_in_1 & in_comps[1][1]
+    neither = ~(first_in_1 | first_in_2 | second_in_1 | second_in_2)
+    # If neither entity is in a component, connect them in a random order
+    flip = neither & (rng.random(rows.shape[0]) < .5)
+    new_first = np.where(second_in_1 | (neither & flip), choices[1], choices[0])
+    new_second = np.where(first_in_2 | (neither & flip), choices[0], choices[1])
+    keep_first = first_in_1 | first_in_2
+    keep_second = second_in_1 | second_in_2
+    sampled_entities[rows, idxs_to_force[0]] = np.where(keep_first, first, new_first)
+    sampled_entities[rows, idxs_to_force[1]] = np.where(keep_second, second, new_second)
 
 def create_time_lag_tuples(
-    time_lags: 'List[Tuple(float,float)]',
-    antecedent: 'List[Tuple[int,int,int]]',
-) -> 'List[Tuple[float,float]]':
-    """ Create time_lag_tuples used to instantiate patterns. Contains logic to prohibit: identical
-    antecedents from having 0 time lag between them, the consequence from having 0 lag from the
-    last antecedent.
+    time_lags: 'List[Tuple(int,int)]',
+    antecedents: np.ndarray,
+    rng: np.random.Generator = None,
+) -> np.ndarray:
+    """ Create the time lags of a batch of patterns, of shape (# of patterns, # of hops, 2),
+    from the antecedents of the patterns, of shape (# of patterns, # of hops, 3). Contains logic
+    to prohibit: identical antecedents from having 0 time lag between them, the consequence from
+    having 0 lag from the last antecedent. Time lag bounds are integer numbers of time windows,
+    and those given as distributions are drawn for all patterns in one call with rng.
     """
-    time_lag_tuples = []
+    rng = np.random.default_rng(rng)
+    n = antecedents.shape[0]
+    values = np.empty((n, len(time_lags), 2), dtype=np.float64)
     for idx, time_lag in enumerate(time_lags):
-        lag_min, lag_max = time_lag[0], time_lag[1]
-        time_lag_tuple = []
-        if type(lag_min) in [float, int]:
-            pass
-        else:
-            lag_min = lag_min()
-        if type(lag_max) in [float, int]:
-            pass
-        else:
-            lag_max = lag_max()
-        # Prohibit identical antecedents from having 0 lag_min between them
-        if (idx < len(antecedent)-1) and (antecedent[idx] == antecedent[idx+1]):
-            lag_min = max(1, lag_min)
-        # Prohibit consequence from having 0 lag_min from the last antecedent
-        if idx == len(antecedent)-1:
-            lag_min = max(1, lag_min)
-        # Enforce that lag_max is no smaller than lag_min
-        time_lag_tuples.append((lag_min, max(lag_min, lag_max)))
-    return time_lag_tuples
+        for bound in range(2):
+            if type(time_lag[bound]) in [float, int]:
+                values[:, idx, bound] = time_lag[bound]
+            else:
+                values[:, idx, bound] = np.asarray(time_lag[bound](n, rng)).reshape(n)
+    # Time lags count time windows
+    if (values != np.round(values)).any():
+        raise ValueError('Time lag bounds must be integers')
+    bounds = values.astype(np.int64)
+    lag_min, lag_max = bounds[:, :, 0], bounds[:, :, 1]
+    # Prohibit identical antecedents from having 0 lag_min between them
+    is_repeated = (antecedents[:, :-1] == antecedents[:, 1:]).all(axis=2)
+    lag_min[:, :-1][is_repeated] = np.maximum(1, lag_min[:, :-1][is_repeated])
+    # Prohibit consequence from having 0 lag_min from the last antecedent
+    lag_min[:, -1] = np.maximum(1, lag_min[:, -1])
+    # Enforce that lag_max is no smaller than lag_min
+    bounds[:, :, 1] = np.maximum(lag_min, lag_max)
+    return bounds